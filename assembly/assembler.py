@@ -1,5 +1,13 @@
-import random
 import copy
+from itertools import product
+import os
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from fasta import read_records
+from seq_utils import get_rng
 
 def comp(DNA: str, pat_len: int) -> list:
     """Sort all substrings of pat_len length
@@ -76,37 +84,48 @@ def overlap_graph(pats: list) -> dict:
                 overlap[start_pat].append(pats[end])
     return overlap
 
-def self_overlap_graph(pats: list) -> dict:
+def self_overlap_graph(pats) -> dict:
     """Construct a self-overlap graph for a group of patterns
 
-    The tailess bit of a string self-overlaps with the headless bit
+    The tailess bit of a string self-overlaps with the headless bit.
+    Patterns are checked as they are added, so they can be streamed in
     
     :param pats: a group of substrings
-    :type pats: list (of strs)
+    :type pats: iterable (of strs)
     :returns: the overlap graph in dictionary form
     :rtype: dict (strs: lists (of strs))
     """
 
-    verify_pats(pats)
     graph = {}
+    pat_len = None
     for pat in pats:
+        if pat_len is None:
+            pat_len = len(pat)
+        elif len(pat) != pat_len:
+            raise ValueError('All patterns must be the same length')
         start = pat[:-1]
         if not start in graph:
             graph[start] = []
         graph[start].append(pat[1:])
+    if pat_len is None:
+        raise ValueError('Cannot convert nonexistant pattern')
     return graph
 
-def new_cycle(graph: dict, old_cycle: list=None) -> list:
+def new_cycle(graph: dict, old_cycle: list=None, rng=None) -> list:
     """Find a new cycle within a graph
 
     :param graph: a self-overlap graph with left-over edges
     :type graph: dict (strs: lists (of strs))
     :param old_cycle: a previously-constructed cycle (default None)
     :type old_cycle: list (of strs)
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
     :returns: a new cycle guarenteed to be longer than old_cycle
     :rtype: list (of strs)
     """
     
+    rng = get_rng(rng)
     if old_cycle:
         # find a node with unused edges
         for node in range(len(old_cycle)):
@@ -120,13 +139,13 @@ def new_cycle(graph: dict, old_cycle: list=None) -> list:
         except NameError:
             raise ValueError('Graph has a closed cycle')
     else:
-        cur = random.choice(list(graph))
+        cur = rng.choice(list(graph))
         cycle = []
 
     # while there are unused edges from the current node
     while cur in graph:
         # use an edge
-        cycle.append(graph[cur].pop(random.randrange(len(graph[cur]))))
+        cycle.append(graph[cur].pop(rng.randrange(len(graph[cur]))))
         # delete nodes from graph if no edges are left
         if not graph[cur]:
             del graph[cur]
@@ -136,25 +155,32 @@ def new_cycle(graph: dict, old_cycle: list=None) -> list:
         cycle.append(cycle[0])
     return cycle
 
-def graph_to_cycle(graph: dict) -> list:
+def graph_to_cycle(graph: dict, rng=None) -> list:
     """Constructs a Eulerian cycle from a self-overlap graph
 
     :param graph: a self-overlap graph
     :type graph: dict (strs: lists (of strs))
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
     :returns: a cycle using all paths in graph
     :rtype: list
     """
 
-    cycle = new_cycle(graph)
+    rng = get_rng(rng)
+    cycle = new_cycle(graph, rng=rng)
     while graph:
-        cycle = new_cycle(graph, cycle)
+        cycle = new_cycle(graph, cycle, rng)
     return cycle
 
-def graph_to_path(graph: dict) -> list:
+def graph_to_path(graph: dict, rng=None) -> list:
     """Constructs a Eulerian path from a self-overlap graph
 
     :param graph: a self-overlap graph
     :type graph: dict (strs: lists (of strs))
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
     :returns: a path using all paths in graph
     :rtype: list
     """
@@ -183,7 +209,7 @@ def graph_to_path(graph: dict) -> list:
         graph[end].append(start)
     else:
         graph[end] = [start]
-    cycle = graph_to_cycle(graph)
+    cycle = graph_to_cycle(graph, rng)
     start_indexes = []
     for node in range(len(cycle)):
         if cycle[node] == start:
@@ -197,18 +223,21 @@ def graph_to_path(graph: dict) -> list:
             break
     return path
 
-def assemble(pats: list) -> str:
+def assemble(pats: list, rng=None) -> str:
     """Assemble a string from substrings
 
     :param pats: a group of substrings
     :type pats: list (of strs)
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
     :returns: the assembled string
     :rtype: str
     """
 
     verify_pats(pats)
     graph = self_overlap_graph(pats)
-    path = graph_to_path(graph)
+    path = graph_to_path(graph, get_rng(rng))
     return path_to_DNA(path)
 
 def verify_pairs(pairs: list):
@@ -272,68 +301,82 @@ def path_to_DNA_read_pairs(path: list, dist: int) -> str:
             raise ValueError('Path not compatible')
     return prefix + suffix[prefix_len - dist - pat_len -1:]
 
-def assemble_read_pairs(pairs: list, dist: int) -> str:
+def assemble_read_pairs(pairs: list, dist: int, rng=None) -> str:
     """Assemble a string from substrings
 
     :param pairs: a group of substrings pairs
     :type pats: list (of tuples (of strs))
     :param dist: the distance between the read-pairs
     :type dist: int
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
     :returns: the assembled string
     :rtype: str
     """
 
     verify_pairs(pairs)
+    # one generator for every attempt, so a seed fixes all of them
+    rng = get_rng(rng)
     graph = overlap_graph_read_pairs(pairs)
     saved_graph = copy.deepcopy(graph)
     while True:
         try:
-            path = graph_to_path(graph)
+            path = graph_to_path(graph, rng)
             DNA = path_to_DNA_read_pairs(path, dist)
             break
         except ValueError:
             graph = copy.deepcopy(saved_graph)
     return DNA
 
-def all_binary(bin_len: int) -> list:
-    """Find all binary strings of a certain length
+def all_binary(bin_len: int):
+    """Find all binary strings of a certain length, in order
+
+    Strings are made one at a time, so only the current one is held
 
     :param bin_len: the length the binary strings should be
     :type bin_len: int
     :returns: all the possible binarys strings of this length
-    :rtype: list (of strs)
+    :rtype: iterator (of strs)
     """
     
-    if bin_len == 0:
-        return ['']
-    elif bin_len < 0:
+    if bin_len < 0:
         raise ValueError('Binary strings cannot have negative length')
-    all_bin = []
-    # extend all shorter strings by 0 and 1
-    for short_bin in all_binary(bin_len - 1):
-        all_bin += [short_bin + '0', short_bin + '1']
-    return all_bin
+    return map(''.join, product('01', repeat=bin_len))
 
-def universal_binary(bin_len: int) -> str:
+def universal_binary(bin_len: int, rng=None) -> str:
     """Constuct a ciruclar universal binary string
 
     :param bin_len: the length of the universal binary patterns
     :type bin_len: int
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
     :returns: a string containing all binary strings of legnth bin_len
     :rtype: str
     """
     
+    # the binary strings stream into the graph, never all held in a list
     graph = self_overlap_graph(all_binary(bin_len))
-    cycle = graph_to_cycle(graph)
+    cycle = graph_to_cycle(graph, get_rng(rng))
     # delete last bin_len - 1 chars since this is CIRCULAR
     cycle = cycle[:-(bin_len - 1)]
     return path_to_DNA(cycle)
 
 if __name__ == '__main__':
-    with open('data.txt') as data:
-        k, dist = [int(x) for x in data.readline().split()]
-        pairs = []
-        for line in data:
-            pairs.append((line[:k], line[k + 1:k + k + 1]))
+    if len(sys.argv) in (2, 3):
+        # a FASTA/FASTQ file of equal-length reads, streamed in one by one,
+        # & optionally a seed to make the assembly reproducible
+        pats = [record.seq.decode('ascii')
+                for record in read_records(sys.argv[1])]
+        seed = int(sys.argv[2]) if len(sys.argv) == 3 else None
+        DNA = assemble(pats, seed)
+    else:
+        with open('data.txt') as data:
+            k, dist = [int(x) for x in data.readline().split()]
+            pairs = []
+            for line in data:
+                pairs.append((line[:k], line[k + 1:k + k + 1]))
+        DNA = assemble_read_pairs(pairs, dist)
     with open('output.txt', mode='w') as output:
-        output.write(assemble_read_pairs(pairs, dist))
+        output.write(DNA)
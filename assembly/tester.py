@@ -1,4 +1,6 @@
 import assembler
+import copy
+import random
 import unittest
 
 class Tester(unittest.TestCase):
@@ -94,12 +96,16 @@ class Tester(unittest.TestCase):
         for pats, graph in self.known_self_overlap:
             result = assembler.self_overlap_graph(pats)
             self.assertEqual(graph, result)
+            # patterns can also be streamed in
+            self.assertEqual(graph, assembler.self_overlap_graph(iter(pats)))
 
     def test_self_overlap_failure(self):
         """Self-overlap graph constructor should error on bad input"""
 
         for pats in self.known_pattern_failure:
             self.assertRaises(ValueError, assembler.self_overlap_graph, pats)
+            self.assertRaises(ValueError, assembler.self_overlap_graph,
+                              iter(pats))
 
     def test_graph_to_cycle(self):
         """Eulerian cycle maker should construct cycles properly"""
@@ -108,6 +114,24 @@ class Tester(unittest.TestCase):
             result = assembler.graph_to_cycle(graph)
             self.assertEqual(cycle, result)
 
+    def test_seeded_graph_to_cycle(self):
+        """Seeded Eulerian cycles should be repeatable & use every edge"""
+
+        # graph_to_cycle empties the graph it is given, so use a new one
+        graph = {'0': ['3'], '1': ['0'], '2': ['1', '6'], '3': ['2'],
+                 '4': ['2'], '5': ['4'], '6': ['5', '8'], '7': ['9'],
+                 '8': ['7'], '9': ['6']}
+        for seed in range(5):
+            result = assembler.graph_to_cycle(copy.deepcopy(graph), seed)
+            self.assertEqual(result, assembler.graph_to_cycle(
+                copy.deepcopy(graph), random.Random(seed)))
+            self.assertEqual(result[0], result[-1])
+            self.assertCountEqual([(start, end) for start in graph
+                                   for end in graph[start]],
+                                  list(zip(result, result[1:])))
+        pairs, dist, DNA = self.known_assemble_read_pairs[0]
+        self.assertEqual(DNA, assembler.assemble_read_pairs(pairs, dist, 3))
+
     def test_graph_to_path(self):
         """Eulerian path maker should construct paths properly"""
 
@@ -122,6 +146,7 @@ class Tester(unittest.TestCase):
         for pats, DNA in self.known_assemble:
             result = assembler.assemble(pats)
             self.assertEqual(DNA, result)
+            self.assertEqual(DNA, assembler.assemble(pats, 3))
 
     def test_assemble_failure(self):
         """DNA assembler should error on bad input"""
@@ -136,5 +161,25 @@ class Tester(unittest.TestCase):
             result = assembler.assemble_read_pairs(pairs, dist)
             self.assertEqual(DNA, result)
 
+    def test_universal_binary(self):
+        """Universal binary strings should hold every binary string once"""
+
+        self.assertEqual(['000', '001', '010', '011', '100', '101', '110',
+                          '111'], list(assembler.all_binary(3)))
+        self.assertEqual([''], list(assembler.all_binary(0)))
+        self.assertRaises(ValueError, assembler.all_binary, -1)
+        for bin_len in range(2, 7):
+            result = assembler.universal_binary(bin_len)
+            self.assertEqual(2 ** bin_len, len(result))
+            # the string is circular, so patterns may wrap around its end
+            circle = result + result[:bin_len - 1]
+            self.assertCountEqual(assembler.all_binary(bin_len),
+                                  [circle[i:i + bin_len]
+                                   for i in range(len(result))])
+            # the same seed always picks the same cycle
+            self.assertEqual(assembler.universal_binary(bin_len, 5),
+                             assembler.universal_binary(bin_len,
+                                                        random.Random(5)))
+
 if __name__ == '__main__':
     unittest.main()
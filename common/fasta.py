@@ -0,0 +1,126 @@
+from collections import namedtuple
+import gzip
+
+# one sequence from a FASTA or FASTQ file; qual is None for FASTA
+Record = namedtuple('Record', ['name', 'seq', 'qual'])
+
+# the first bytes of every gzip file
+GZIP_MAGIC = b'\x1f\x8b'
+
+def open_seq_file(path: str):
+    """Opens a sequence file for reading as bytes, gzipped or not
+
+    :param path: the file to open
+    :type path: str
+    :returns: a binary file object, decompressing if needed
+    :rtype: file object
+    """
+
+    with open(path, mode='rb') as test:
+        magic = test.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(path, mode='rb')
+    return open(path, mode='rb')
+
+def read_fasta(lines, upper: bool=True):
+    """Reads FASTA records one at a time
+
+    Only the record being read is held in memory
+
+    :param lines: the lines of a FASTA file, as bytes
+    :type lines: iterable (of bytes)
+    :param upper: whether to upper-case soft-masked bases (default True)
+    :type upper: bool
+    :returns: each record, with its sequence as bytes
+    :rtype: generator (of Records)
+    """
+
+    name = None
+    parts = []
+    for line in lines:
+        line = line.rstrip(b'\r\n')
+        if line.startswith(b'>'):
+            if name is not None:
+                yield _make_record(name, parts, None, upper)
+            name = line[1:].decode()
+            parts = []
+        elif line:
+            if name is None:
+                raise ValueError('FASTA sequence found before any header')
+            parts.append(line)
+    if name is not None:
+        yield _make_record(name, parts, None, upper)
+
+def read_fastq(lines, upper: bool=True):
+    """Reads FASTQ records one at a time
+
+    Only the record being read is held in memory
+
+    :param lines: the lines of a FASTQ file, as bytes
+    :type lines: iterable (of bytes)
+    :param upper: whether to upper-case soft-masked bases (default True)
+    :type upper: bool
+    :returns: each record, with its sequence & qualities as bytes
+    :rtype: generator (of Records)
+    """
+
+    lines = iter(lines)
+    for header in lines:
+        header = header.rstrip(b'\r\n')
+        if not header:
+            continue
+        if not header.startswith(b'@'):
+            raise ValueError('FASTQ record does not start with "@"')
+        try:
+            seq = next(lines).rstrip(b'\r\n')
+            plus = next(lines)
+            qual = next(lines).rstrip(b'\r\n')
+        except StopIteration:
+            raise ValueError('FASTQ file ends part-way through a record')
+        if not plus.startswith(b'+'):
+            raise ValueError('FASTQ separator line does not start with "+"')
+        if len(seq) != len(qual):
+            raise ValueError('FASTQ sequence & qualities differ in length')
+        yield _make_record(header[1:].decode(), [seq], qual, upper)
+
+def _make_record(name: str, parts: list, qual: bytes, upper: bool) -> Record:
+    """Joins the pieces of one record together
+
+    :param name: the record's header, without its marker
+    :type name: str
+    :param parts: the lines of the record's sequence
+    :type parts: list (of bytes)
+    :param qual: the record's qualities, or None for FASTA
+    :type qual: bytes
+    :param upper: whether to upper-case the sequence
+    :type upper: bool
+    :returns: the finished record
+    :rtype: Record
+    """
+
+    seq = parts[0] if len(parts) == 1 else b''.join(parts)
+    if upper:
+        seq = seq.upper()
+    return Record(name, seq, qual)
+
+def read_records(path: str, upper: bool=True):
+    """Reads every record from a FASTA or FASTQ file, gzipped or not
+
+    The format is decided by the first character of the file
+
+    :param path: the file to read
+    :type path: str
+    :param upper: whether to upper-case soft-masked bases (default True)
+    :type upper: bool
+    :returns: each record, with its sequence as bytes
+    :rtype: generator (of Records)
+    """
+
+    with open_seq_file(path) as data:
+        first = data.peek(1)[:1]
+        if first == b'@':
+            yield from read_fastq(data, upper)
+        elif first in (b'>', b''):
+            yield from read_fasta(data, upper)
+        else:
+            raise ValueError('File is neither FASTA nor FASTQ')
@@ -0,0 +1,447 @@
+from functools import lru_cache
+from itertools import combinations, product
+import random
+
+BASES = ('A', 'C', 'G', 'T')
+# matches bases with their 2-bit numbers, earlier in the alphabet = lower
+BASE_NUM = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+# translation tables from bases to their 2-bit numbers, one byte each
+_STR_ENCODE = str.maketrans('ACGT', '\x00\x01\x02\x03')
+_BYTES_ENCODE = bytes.maketrans(b'ACGT', b'\x00\x01\x02\x03')
+# deletes all valid bases, leaving only invalid ones behind
+_STR_NON_DNA = str.maketrans('', '', 'ACGT')
+# matches bases with their complements
+COMP = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A'}
+# translation tables from bases to their complements
+COMP_TABLE = str.maketrans(COMP)
+BYTES_COMP_TABLE = bytes.maketrans(b'ACGT', b'TGCA')
+
+def check_DNA(DNA):
+    """Checks that a DNA string only contains the bases ACGT
+
+    Raises an appropriate error if it does not
+
+    :param DNA: the DNA string to check
+    :type DNA: str or bytes-like
+    """
+
+    if isinstance(DNA, str):
+        bad = DNA.translate(_STR_NON_DNA)
+    else:
+        bad = bytes(DNA).translate(None, b'ACGT').decode('latin-1')
+    if bad:
+        raise ValueError('Non-DNA base "' + bad[0] + '" in given string')
+
+def encode(DNA) -> bytes:
+    """Converts a DNA string to one byte per base, holding its 2-bit number
+
+    :param DNA: the DNA string of ACGT to convert
+    :type DNA: str or bytes-like
+    :returns: the numbers (0-3) of each base in DNA
+    :rtype: bytes
+    """
+
+    check_DNA(DNA)
+    if isinstance(DNA, str):
+        return DNA.translate(_STR_ENCODE).encode('ascii')
+    return bytes(DNA).translate(_BYTES_ENCODE)
+
+def rev_comp(pat):
+    """Finds the reverse complement of a DNA string
+
+    :param pat: the DNA string to REVerse COMPlement
+    :type pat: str or bytes-like
+    :returns: the reverse complement of pat, as the same type for strs and
+              as bytes otherwise
+    :rtype: str or bytes
+    """
+
+    if not pat:
+        raise ValueError('Cannot reverse-complement empty string')
+    check_DNA(pat)
+    if isinstance(pat, str):
+        return pat.translate(COMP_TABLE)[::-1]
+    return bytes(pat).translate(BYTES_COMP_TABLE)[::-1]
+
+def iter_rev_comp(DNA, chunk_size: int=1 << 20):
+    """Yields the reverse complement of a long DNA string piece by piece
+
+    Only one chunk is held at a time, so DNA can be a memory-mapped file
+
+    :param DNA: the DNA string to REVerse COMPlement
+    :type DNA: str or bytes-like (anything that can be sliced)
+    :param chunk_size: the number of bases in each piece (default 2^20)
+    :type chunk_size: int
+    :returns: consecutive pieces of the reverse complement of DNA
+    :rtype: generator (of strs or bytes)
+    """
+
+    if not DNA:
+        raise ValueError('Cannot reverse-complement empty string')
+    if chunk_size < 1:
+        raise ValueError('Chunks must be at least 1 base long')
+    # the end of DNA is the start of its reverse complement
+    for end in range(len(DNA), 0, -chunk_size):
+        yield rev_comp(DNA[max(end - chunk_size, 0):end])
+
+def get_rng(rng=None):
+    """Finds where to draw random numbers from
+
+    :param rng: a random number generator, a seed for a new one, or
+                None for the random module's shared generator
+    :type rng: random.Random or int
+    :returns: a random number generator
+    :rtype: random.Random (or the random module)
+    """
+
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    return rng
+
+def pat_to_code(pat: str) -> int:
+    """Converts a whole DNA string to its 2-bit packed number
+
+    :param pat: the DNA string to convert
+    :type pat: str
+    :returns: a number holding 2 bits per base, first base highest
+    :rtype: int
+    """
+
+    if not pat:
+        raise ValueError('Cannot convert empty string to number')
+    code = 0
+    for num in encode(pat):
+        code = (code << 2) | num
+    return code
+
+def code_to_pat(code: int, pat_len: int) -> str:
+    """Converts a 2-bit packed number back to a DNA string
+
+    :param code: the number to convert
+    :type code: int
+    :param pat_len: the length of the eventual string
+    :type pat_len: int
+    :returns: the DNA string of length pat_len equivalent to code
+    :rtype: str
+    """
+
+    if code < 0:
+        raise ValueError('DNA numbers must be non-negative')
+    if pat_len < 1:
+        raise ValueError('DNA strings must be at least length 1')
+    if code >> (2 * pat_len):
+        raise ValueError('Number is too large for length given')
+    return ''.join(BASES[(code >> (2 * (pat_len - i - 1))) & 3]
+                   for i in range(pat_len))
+
+def encoded_chunks(DNA):
+    """Converts a DNA string to 2-bit numbers, one piece at a time
+
+    Objects which store their own DNA (like a TwoBitGenome) may provide
+    an encoded_chunks method, so they never need to be held whole
+
+    :param DNA: the DNA string to convert
+    :type DNA: str or bytes-like, or anything with an encoded_chunks method
+    :returns: consecutive pieces of encode(DNA)
+    :rtype: iterable (of bytes)
+    """
+
+    if hasattr(DNA, 'encoded_chunks'):
+        return DNA.encoded_chunks()
+    return [encode(DNA)]
+
+def iter_kmer_codes(DNA, pat_len: int):
+    """Yields the number of every substring of a certain length, in order
+
+    Numbers are rolled along the string 2 bits at a time instead of
+    being re-calculated for each substring
+
+    :param DNA: the DNA string to convert
+    :type DNA: str or bytes-like, or anything with an encoded_chunks method
+    :param pat_len: the length of substrings to convert
+    :type pat_len: int
+    :returns: pat_to_code(DNA[i:i + pat_len]) for each i
+    :rtype: generator (of ints)
+    """
+
+    if not DNA:
+        raise ValueError('Cannot convert empty string to numbers')
+    if pat_len < 1:
+        raise ValueError('Patterns must have length at least 1')
+    return _roll_codes(encoded_chunks(DNA), pat_len)
+
+def _roll_codes(chunks, pat_len: int):
+    """Yields the number of every substring of some encoded DNA, in order
+
+    :param chunks: consecutive pieces of one encoded DNA string
+    :type chunks: iterable (of bytes)
+    :param pat_len: the length of substrings to convert
+    :type pat_len: int
+    :returns: the number of each substring, across pieces
+    :rtype: generator (of ints)
+    """
+
+    # only the last pat_len bases are kept in the rolling number
+    mask = (1 << (2 * pat_len)) - 1
+    code = 0
+    # bases still needed before the first whole substring
+    missing = pat_len - 1
+    for nums in chunks:
+        if missing:
+            head = nums[:missing]
+            for num in head:
+                code = (code << 2) | num
+            missing -= len(head)
+            nums = nums[len(head):]
+        for num in nums:
+            code = ((code << 2) | num) & mask
+            yield code
+
+def kmer_codes(DNA, pat_len: int) -> list:
+    """Converts every substring of a certain length to its number
+
+    :param DNA: the DNA string to convert
+    :type DNA: str or bytes-like, or anything with an encoded_chunks method
+    :param pat_len: the length of substrings to convert
+    :type pat_len: int
+    :returns: a list where [i] is pat_to_code(DNA[i:i + pat_len])
+    :rtype: list (of ints)
+    """
+
+    return list(iter_kmer_codes(DNA, pat_len))
+
+def encoded_kmer_codes(nums: bytes, pat_len: int) -> list:
+    """Converts every substring of an already-encoded string to its number
+
+    Unlike kmer_codes, the string is not checked or encoded again
+
+    :param nums: the DNA string, encoded (see encode)
+    :type nums: bytes
+    :param pat_len: the length of substrings to convert
+    :type pat_len: int
+    :returns: a list where [i] is the number of the substring at i
+    :rtype: list (of ints)
+    """
+
+    if pat_len < 1:
+        raise ValueError('Patterns must have length at least 1')
+    return list(_roll_codes([nums], pat_len))
+
+def rev_comp_code(code: int, pat_len: int) -> int:
+    """Finds the packed number of a packed DNA string's reverse complement
+
+    Complementary bases have numbers adding to 3, so complementing is an
+    XOR with all 1s, after which the 2-bit bases are read in reverse
+
+    :param code: the packed number to REVerse COMPlement
+    :type code: int
+    :param pat_len: the number of bases packed into code
+    :type pat_len: int
+    :returns: the packed number of the reverse complement
+    :rtype: int
+    """
+
+    code ^= (1 << (2 * pat_len)) - 1
+    rev = 0
+    for _ in range(pat_len):
+        rev = (rev << 2) | (code & 3)
+        code >>= 2
+    return rev
+
+def iter_canonical_codes(DNA, pat_len: int):
+    """Yields the lower of each substring's and its rev-comp's number
+
+    Reverse complements are rolled along the string alongside the
+    substrings themselves, so no strings are ever reversed
+
+    :param DNA: the DNA string to convert
+    :type DNA: str or bytes-like, or anything with an encoded_chunks method
+    :param pat_len: the length of substrings to convert
+    :type pat_len: int
+    :returns: the canonical number of DNA[i:i + pat_len] for each i
+    :rtype: generator (of ints)
+    """
+
+    if not DNA:
+        raise ValueError('Cannot convert empty string to numbers')
+    if pat_len < 1:
+        raise ValueError('Patterns must have length at least 1')
+    mask = (1 << (2 * pat_len)) - 1
+    # a new base's complement enters the reverse number at the top
+    top_shift = 2 * (pat_len - 1)
+    code = 0
+    rev = 0
+    seen = 0
+    for nums in encoded_chunks(DNA):
+        for num in nums:
+            code = ((code << 2) | num) & mask
+            rev = (rev >> 2) | ((3 - num) << top_shift)
+            seen += 1
+            if seen >= pat_len:
+                yield code if code < rev else rev
+
+def canonical_codes(DNA, pat_len: int) -> list:
+    """Converts every substring to the lower of its and its rev-comp's number
+
+    :param DNA: the DNA string to convert
+    :type DNA: str or bytes-like, or anything with an encoded_chunks method
+    :param pat_len: the length of substrings to convert
+    :type pat_len: int
+    :returns: a list where [i] is the canonical number of DNA[i:i + pat_len]
+    :rtype: list (of ints)
+    """
+
+    return list(iter_canonical_codes(DNA, pat_len))
+
+def low_bits(pat_len: int) -> int:
+    """Makes a mask of the low bit of every base in a packed number
+
+    :param pat_len: the number of bases packed into the number
+    :type pat_len: int
+    :returns: 0b0101...01, with pat_len 1s
+    :rtype: int
+    """
+
+    return int('01' * pat_len, 2)
+
+def code_dists(codes: list, code: int, pat_len: int) -> list:
+    """Calculates the Hamming distance of one number against many
+
+    Two bases differ if their XOR is non-zero, so OR-ing the 2 bits of
+    each base together and counting the set bits counts the mismatches
+
+    :param codes: packed numbers to compare against, e.g. from kmer_codes
+    :type codes: list (of ints)
+    :param code: the packed number of the pattern to compare
+    :type code: int
+    :param pat_len: the number of bases packed into each number
+    :type pat_len: int
+    :returns: a list where [i] is the Hamming distance of codes[i] & code
+    :rtype: list (of ints)
+    """
+
+    low = low_bits(pat_len)
+    return [(((diff := other ^ code) | (diff >> 1)) & low).bit_count()
+            for other in codes]
+
+def window_dists(DNA, pat: str) -> list:
+    """Calculates the Hamming distance of a pattern against every window
+
+    :param DNA: the longer string to compare against
+    :type DNA: str or bytes-like
+    :param pat: the pattern to compare
+    :type pat: str
+    :returns: a list where [i] is the distance of pat & DNA[i:i + len(pat)]
+    :rtype: list (of ints)
+    """
+
+    pat_len = len(pat)
+    return code_dists(kmer_codes(DNA, pat_len), pat_to_code(pat), pat_len)
+
+def window_dists_batch(DNA, pats: list) -> list:
+    """Calculates the Hamming distances of many patterns against every window
+
+    Windows are only converted to numbers once for each pattern length
+
+    :param DNA: the longer string to compare against
+    :type DNA: str or bytes-like
+    :param pats: the patterns to compare
+    :type pats: list (of strs)
+    :returns: a list where [j][i] is the distance of pats[j] &
+              DNA[i:i + len(pats[j])]
+    :rtype: list (of lists (of ints))
+    """
+
+    codes = {}
+    dists = []
+    for pat in pats:
+        pat_len = len(pat)
+        if pat_len not in codes:
+            codes[pat_len] = kmer_codes(DNA, pat_len)
+        dists.append(code_dists(codes[pat_len], pat_to_code(pat), pat_len))
+    return dists
+
+@lru_cache(maxsize=None)
+def sub_masks(pat_len: int, dist: int) -> tuple:
+    """Makes every XOR mask that substitutes at most dist bases
+
+    XOR-ing a packed number with each mask gives each of its neighbors
+    exactly once, starting with itself and moving out by distance
+
+    :param pat_len: the number of bases packed into each number
+    :type pat_len: int
+    :param dist: the maximum number of substitutions to allow
+    :type dist: int
+    :returns: the masks, in order of the substitutions they make
+    :rtype: tuple (of ints)
+    """
+
+    if pat_len < 1:
+        raise ValueError('Patterns must have length at least 1')
+    if dist < 0:
+        raise ValueError('Cannot have a negative distance')
+    masks = [0]
+    for cur_dist in range(1, min(dist, pat_len) + 1):
+        for spots in combinations(range(pat_len), cur_dist):
+            # XOR-ing a base with 1, 2 or 3 changes it to each other base
+            for changes in product((1, 2, 3), repeat=cur_dist):
+                mask = 0
+                for spot, change in zip(spots, changes):
+                    mask |= change << (2 * (pat_len - spot - 1))
+                masks.append(mask)
+    return tuple(masks)
+
+def neighbor_codes(code: int, pat_len: int, dist: int):
+    """Yields the packed numbers of every neighbor of a packed DNA string
+
+    'Neighbors' are strings of the same length with at most dist
+    base substitutions. This includes the original string
+
+    :param code: the packed number of the string to find neighbors of
+    :type code: int
+    :param pat_len: the number of bases packed into code
+    :type pat_len: int
+    :param dist: the maximum number of changes to allow
+    :type dist: int
+    :returns: the packed numbers of all neighbors, nearest first
+    :rtype: generator (of ints)
+    """
+
+    if code < 0 or code >> (2 * pat_len):
+        raise ValueError('Number does not fit in the length given')
+    for mask in sub_masks(pat_len, dist):
+        yield code ^ mask
+
+@lru_cache(maxsize=4096)
+def cached_neighbor_codes(code: int, pat_len: int, dist: int) -> tuple:
+    """Finds the packed numbers of every neighbor, remembering recent ones
+
+    :param code: the packed number of the string to find neighbors of
+    :type code: int
+    :param pat_len: the number of bases packed into code
+    :type pat_len: int
+    :param dist: the maximum number of changes to allow
+    :type dist: int
+    :returns: the packed numbers of all neighbors, nearest first
+    :rtype: tuple (of ints)
+    """
+
+    return tuple(neighbor_codes(code, pat_len, dist))
+
+def iter_neighbors(pat: str, dist: int):
+    """Yields every neighbor of a DNA string, as strings
+
+    :param pat: the DNA string to find neighbors of
+    :type pat: str
+    :param dist: the maximum number of changes to allow
+    :type dist: int
+    :returns: all neighbors of pat, nearest first
+    :rtype: generator (of strs)
+    """
+
+    pat_len = len(pat)
+    for code in neighbor_codes(pat_to_code(pat), pat_len, dist):
+        yield code_to_pat(code, pat_len)
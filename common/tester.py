@@ -0,0 +1,225 @@
+import fasta
+import gzip
+import os
+import random
+import seq_utils
+import tempfile
+import twobit
+import unittest
+
+class Tester(unittest.TestCase):
+    """Unit tester for the shared sequence utilities"""
+
+    # test cases for encode
+    known_encode = (('ACGT', b'\x00\x01\x02\x03'),
+                    (b'GGAT', b'\x02\x02\x00\x03'),
+                    (bytearray(b'T'), b'\x03'))
+
+    # test cases for window_dists
+    known_window_dists = (('AGGGTCAGCGATCA', 'TCA',
+                           [3, 3, 3, 3, 0, 3, 3, 2, 2, 3, 3, 0]),
+                          ('AAAAAA', 'TTT', [3, 3, 3, 3]),
+                          ('ACG', 'ACGT', []))
+
+    def test_encode(self):
+        """DNA should be encoded to one 2-bit number per byte"""
+
+        for DNA, nums in self.known_encode:
+            self.assertEqual(nums, seq_utils.encode(DNA))
+
+    def test_encode_failure(self):
+        """DNA encoder should error on bad input"""
+
+        self.assertRaises(ValueError, seq_utils.encode, 'ACGN')
+        self.assertRaises(ValueError, seq_utils.encode, b'acgt')
+        self.assertRaises(ValueError, seq_utils.encode, 'AC GT')
+
+    def test_rev_comp(self):
+        """Reverse complement should be found for strs and bytes"""
+
+        self.assertEqual('ACCGGGTTTT', seq_utils.rev_comp('AAAACCCGGT'))
+        self.assertEqual(b'GTGTGT', seq_utils.rev_comp(b'ACACAC'))
+        self.assertEqual(b'AT', seq_utils.rev_comp(memoryview(b'AT')))
+        self.assertRaises(ValueError, seq_utils.rev_comp, '')
+        self.assertRaises(ValueError, seq_utils.rev_comp, 'ACGTR')
+        self.assertRaises(ValueError, seq_utils.rev_comp, b'acgt')
+
+    def test_iter_rev_comp(self):
+        """Chunked reverse complement should match the whole one"""
+
+        DNA = 'ACGTTGCATGTCGCATGATGCATGAGAGCT'
+        for chunk_size in (1, 4, 7, 30, 100):
+            chunks = list(seq_utils.iter_rev_comp(DNA, chunk_size))
+            self.assertEqual(seq_utils.rev_comp(DNA), ''.join(chunks))
+            self.assertTrue(all(len(chunk) <= chunk_size for chunk in chunks))
+        self.assertRaises(ValueError, list, seq_utils.iter_rev_comp('', 4))
+        self.assertRaises(ValueError, list, seq_utils.iter_rev_comp('AC', 0))
+
+    def test_get_rng(self):
+        """RNG helper should take a generator, a seed, or nothing"""
+
+        rng = random.Random(3)
+        self.assertIs(rng, seq_utils.get_rng(rng))
+        self.assertIs(random, seq_utils.get_rng())
+        self.assertEqual(random.Random(3).random(),
+                         seq_utils.get_rng(3).random())
+
+    def test_code_to_pat_to_code(self):
+        """number -> DNA string conversion should be reversible"""
+
+        for pat_len in range(1, 6):
+            for code in range(4 ** pat_len):
+                pat = seq_utils.code_to_pat(code, pat_len)
+                self.assertEqual(code, seq_utils.pat_to_code(pat))
+        self.assertRaises(ValueError, seq_utils.code_to_pat, -1, 10)
+        self.assertRaises(ValueError, seq_utils.code_to_pat, 17, 2)
+        self.assertRaises(ValueError, seq_utils.code_to_pat, 3, 0)
+        self.assertRaises(ValueError, seq_utils.pat_to_code, '')
+
+    def test_kmer_codes(self):
+        """Rolling substring numbers should match whole-string numbers"""
+
+        DNA = 'ACGTTGCATGTCGCATGATGCATGAGAGCT'
+        for pat_len in range(1, 8):
+            result = seq_utils.kmer_codes(DNA, pat_len)
+            self.assertEqual([seq_utils.pat_to_code(DNA[i:i + pat_len])
+                              for i in range(len(DNA) - pat_len + 1)], result)
+            self.assertEqual(result, seq_utils.kmer_codes(DNA.encode(),
+                                                          pat_len))
+            self.assertEqual(result, seq_utils.encoded_kmer_codes(
+                seq_utils.encode(DNA), pat_len))
+
+    def test_rev_comp_code(self):
+        """Reverse complements should be found on packed numbers"""
+
+        for pat, rev in (('AAAACCCGGT', 'ACCGGGTTTT'), ('ACGT', 'ACGT'),
+                         ('G', 'C')):
+            result = seq_utils.rev_comp_code(seq_utils.pat_to_code(pat),
+                                             len(pat))
+            self.assertEqual(seq_utils.pat_to_code(rev), result)
+
+    def test_canonical_codes(self):
+        """Canonical numbers should be the lower of either strand's"""
+
+        DNA = 'ACGTTGCATGTCGCATGATGCATGAGAGCT'
+        for pat_len in range(1, 8):
+            result = seq_utils.canonical_codes(DNA, pat_len)
+            codes = seq_utils.kmer_codes(DNA, pat_len)
+            self.assertEqual([min(code, seq_utils.rev_comp_code(code, pat_len))
+                              for code in codes], result)
+
+    def test_window_dists(self):
+        """Distances against every window should be found correctly"""
+
+        for DNA, pat, dists in self.known_window_dists:
+            self.assertEqual(dists, seq_utils.window_dists(DNA, pat))
+
+    def test_window_dists_batch(self):
+        """Batched distances should match one-at-a-time distances"""
+
+        DNA, _, __ = self.known_window_dists[0]
+        pats = ['TCA', 'AGCG', 'GGG', 'CATCAG']
+        result = seq_utils.window_dists_batch(DNA, pats)
+        self.assertEqual([seq_utils.window_dists(DNA, pat) for pat in pats],
+                         result)
+
+    def test_sub_masks(self):
+        """Substitution masks should reach every neighbor exactly once"""
+
+        for pat_len in range(1, 5):
+            for dist in range(0, 4):
+                masks = seq_utils.sub_masks(pat_len, dist)
+                self.assertEqual(len(masks), len(set(masks)))
+                dists = seq_utils.code_dists(masks, 0, pat_len)
+                self.assertEqual(dists, sorted(dists))
+                # every number within dist of 0 should have a mask
+                all_dists = seq_utils.code_dists(range(4 ** pat_len), 0,
+                                                 pat_len)
+                self.assertEqual(len(masks), sum(1 for cur_dist in all_dists
+                                                 if cur_dist <= dist))
+        self.assertRaises(ValueError, seq_utils.sub_masks, 0, 1)
+        self.assertRaises(ValueError, seq_utils.sub_masks, 3, -1)
+
+    def test_neighbors(self):
+        """Neighbors should be generated as numbers and as strings"""
+
+        self.assertCountEqual(['ACG', 'CCG', 'GCG', 'TCG', 'AAG', 'AGG', 'ATG',
+                               'ACA', 'ACC', 'ACT'],
+                              seq_utils.iter_neighbors('ACG', 1))
+        self.assertEqual(['T'], list(seq_utils.iter_neighbors('T', 0)))
+        code = seq_utils.pat_to_code('GATTACA')
+        self.assertEqual(list(seq_utils.neighbor_codes(code, 7, 2)),
+                         list(seq_utils.cached_neighbor_codes(code, 7, 2)))
+        self.assertRaises(ValueError, list,
+                          seq_utils.neighbor_codes(code, 3, 1))
+        self.assertRaises(ValueError, list,
+                          seq_utils.iter_neighbors('ACN', 1))
+
+    def test_read_fasta(self):
+        """FASTA records should be read, gzipped or not"""
+
+        text = b'>one first\nACGT\nacgg\n\n>two\r\nTTTT\r\n>empty\n'
+        records = [fasta.Record('one first', b'ACGTACGG', None),
+                   fasta.Record('two', b'TTTT', None),
+                   fasta.Record('empty', b'', None)]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'seqs.fa')
+            with open(path, mode='wb') as output:
+                output.write(text)
+            self.assertEqual(records, list(fasta.read_records(path)))
+            with gzip.open(path + '.gz', mode='wb') as output:
+                output.write(text)
+            self.assertEqual(records, list(fasta.read_records(path + '.gz')))
+        self.assertEqual(b'acgt', next(fasta.read_fasta([b'>a', b'acgt'],
+                                                        False)).seq)
+        self.assertRaises(ValueError, list, fasta.read_fasta([b'ACGT']))
+
+    def test_read_fastq(self):
+        """FASTQ records should be read"""
+
+        text = b'@r1\nACGT\n+\nIIII\n@r2\nGG\n+r2\n#I\n'
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'reads.fq')
+            with open(path, mode='wb') as output:
+                output.write(text)
+            self.assertEqual([fasta.Record('r1', b'ACGT', b'IIII'),
+                              fasta.Record('r2', b'GG', b'#I')],
+                             list(fasta.read_records(path)))
+        self.assertRaises(ValueError, list,
+                          fasta.read_fastq([b'@r1', b'ACGT', b'+', b'II']))
+        self.assertRaises(ValueError, list,
+                          fasta.read_fastq([b'@r1', b'ACGT', b'+']))
+        self.assertRaises(ValueError, list,
+                          fasta.read_fastq([b'>r1', b'ACGT', b'+', b'IIII']))
+
+    def test_two_bit_genome(self):
+        """2-bit genomes should give back the bases they were written from"""
+
+        DNA = 'ACGTTGCATGTCGCATGATGCATGAGAGCTA'
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'genome.2bit')
+            chunks = [DNA[:5], DNA[5:6], DNA[6:20].encode(), DNA[20:]]
+            self.assertEqual(len(DNA), twobit.write_2bit(chunks, path))
+            with twobit.TwoBitGenome(path) as genome:
+                self.assertEqual(len(DNA), len(genome))
+                self.assertEqual(DNA.encode(), genome[:])
+                for start in range(len(DNA)):
+                    self.assertEqual(DNA[start:start + 6].encode(),
+                                     genome[start:start + 6])
+                self.assertEqual(b'A', genome[-1])
+                self.assertEqual(DNA.encode(), b''.join(genome.chunks(7)))
+                self.assertEqual(seq_utils.encode(DNA),
+                                 b''.join(genome.encoded_chunks(3)))
+                self.assertEqual(seq_utils.kmer_codes(DNA, 5),
+                                 seq_utils.kmer_codes(genome, 5))
+                self.assertRaises(IndexError, genome.__getitem__, len(DNA))
+                self.assertRaises(ValueError, genome.__getitem__,
+                                  slice(0, 10, 2))
+            self.assertRaises(ValueError, twobit.write_2bit, ['ACN'], path)
+            self.assertRaises(ValueError, twobit.write_2bit, [], path)
+            with open(path, mode='wb') as output:
+                output.write(b'>not a genome\n')
+            self.assertRaises(ValueError, twobit.TwoBitGenome, path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+from itertools import product
+import mmap
+import struct
+
+from seq_utils import check_DNA
+
+# marks the start of a 2-bit genome file
+MAGIC = b'PB2B'
+# magic, number of bases
+HEADER = struct.Struct('<4sQ')
+# bases held in each byte, first base in the highest 2 bits
+PER_BYTE = 4
+
+# every group of 4 ASCII bases, matched with the byte packing them
+_PACK = {bytes(bases): num for num, bases in
+         enumerate(product(b'ACGT', repeat=PER_BYTE))}
+# each byte unpacked back to 4 ASCII bases, and to 4 2-bit numbers
+_UNPACK = [bytes(bases) for bases in product(b'ACGT', repeat=PER_BYTE)]
+_UNPACK_NUMS = [bytes(nums) for nums in product(range(4), repeat=PER_BYTE)]
+
+def _pack(DNA: bytes) -> bytes:
+    """Packs ASCII DNA, a multiple of 4 bases long, into 2 bits per base
+
+    :param DNA: the DNA string to pack
+    :type DNA: bytes
+    :returns: one byte for every 4 bases
+    :rtype: bytes
+    """
+
+    quads = map(slice, range(0, len(DNA), PER_BYTE),
+                range(PER_BYTE, len(DNA) + PER_BYTE, PER_BYTE))
+    return bytes(map(_PACK.__getitem__, map(DNA.__getitem__, quads)))
+
+def write_2bit(chunks, path: str) -> int:
+    """Converts a DNA string to a 2-bit genome file
+
+    Only one chunk is held in memory at a time
+
+    :param chunks: consecutive pieces of one DNA string, e.g. the
+                   sequence of a FASTA record
+    :type chunks: iterable (of strs or bytes-likes)
+    :param path: the file to write to
+    :type path: str
+    :returns: the number of bases written
+    :rtype: int
+    """
+
+    DNA_len = 0
+    # bases left over from the last chunk that did not fill a byte
+    left = b''
+    with open(path, mode='wb') as output:
+        # the length is filled in once it is known
+        output.write(HEADER.pack(MAGIC, 0))
+        for chunk in chunks:
+            check_DNA(chunk)
+            if isinstance(chunk, str):
+                chunk = chunk.encode('ascii')
+            chunk = left + bytes(chunk)
+            whole = len(chunk) - len(chunk) % PER_BYTE
+            output.write(_pack(chunk[:whole]))
+            left = chunk[whole:]
+            DNA_len += whole
+        if left:
+            # padding with A's is harmless, since the length is stored
+            output.write(_pack(left + b'A' * (PER_BYTE - len(left))))
+            DNA_len += len(left)
+        if not DNA_len:
+            raise ValueError('Cannot store empty string')
+        output.seek(0)
+        output.write(HEADER.pack(MAGIC, DNA_len))
+    return DNA_len
+
+class TwoBitGenome:
+    """A DNA string read lazily from a memory-mapped 2-bit genome file
+
+    Slicing gives ASCII bases as bytes, so a genome can be passed to
+    functions expecting a DNA string. Only the bytes actually touched
+    are read from disk
+
+    chunks: yield consecutive pieces of the DNA as ASCII bytes
+    encoded_chunks: yield consecutive pieces of the DNA as 2-bit numbers
+    close: release the memory-mapped file
+
+    read-only attributes: path
+    """
+
+    def __init__(self, path: str):
+        """Map the genome file into memory
+
+        :param path: a file written by write_2bit
+        :type path: str
+        """
+
+        self._path = path
+        with open(path, mode='rb') as data:
+            self._map = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError('File is not a 2-bit genome')
+        magic, self._len = HEADER.unpack(self._map[:HEADER.size])
+        if (magic != MAGIC or len(self._map) - HEADER.size
+                != -(-self._len // PER_BYTE)):
+            self.close()
+            raise ValueError('File is not a 2-bit genome')
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _unpack(self, start: int, stop: int, table: list) -> bytes:
+        """Unpack the bases in a range through a lookup table
+
+        :param start: the index of the first base
+        :type start: int
+        :param stop: the index after the last base
+        :type stop: int
+        :param table: what each packed byte unpacks to
+        :type table: list (of bytes)
+        :returns: the unpacked bases
+        :rtype: bytes
+        """
+
+        if start >= stop:
+            return b''
+        first = start // PER_BYTE
+        last = -(-stop // PER_BYTE)
+        packed = self._map[HEADER.size + first:HEADER.size + last]
+        bases = b''.join(map(table.__getitem__, packed))
+        skip = start - first * PER_BYTE
+        return bases[skip:skip + stop - start]
+
+    def __getitem__(self, index):
+        """Get a base or a slice of bases
+
+        :param index: the index or slice to get (slice steps must be 1)
+        :type index: int or slice
+        :returns: the bases, as ASCII
+        :rtype: bytes
+        """
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                raise ValueError('2-bit genomes can only be sliced in order')
+            return self._unpack(start, stop, _UNPACK)
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('Base index out of range')
+        return self._unpack(index, index + 1, _UNPACK)
+
+    def chunks(self, chunk_size: int=1 << 20):
+        """Yield consecutive pieces of the DNA as ASCII bytes
+
+        :param chunk_size: the number of bases in each piece (default 2^20)
+        :type chunk_size: int
+        :returns: consecutive pieces of the DNA
+        :rtype: generator (of bytes)
+        """
+
+        if chunk_size < 1:
+            raise ValueError('Chunks must be at least 1 base long')
+        for start in range(0, self._len, chunk_size):
+            yield self._unpack(start, min(start + chunk_size, self._len),
+                               _UNPACK)
+
+    def encoded_chunks(self, chunk_size: int=1 << 20):
+        """Yield consecutive pieces of the DNA as 2-bit numbers
+
+        Numbers are unpacked straight from the file, without ever
+        producing ASCII bases or re-checking them
+
+        :param chunk_size: the number of bases in each piece (default 2^20)
+        :type chunk_size: int
+        :returns: consecutive pieces of the DNA, one number per byte
+        :rtype: generator (of bytes)
+        """
+
+        if chunk_size < 1:
+            raise ValueError('Chunks must be at least 1 base long')
+        for start in range(0, self._len, chunk_size):
+            yield self._unpack(start, min(start + chunk_size, self._len),
+                               _UNPACK_NUMS)
+
+    def close(self):
+        """Release the memory-mapped file"""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,169 @@
+from collections import deque
+import os
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from freq_finder import BASE_NUM, rev_comp
+from seq_utils import encode
+
+class PatternMatcher:
+    """An Aho-Corasick automaton which finds many patterns in one scan
+
+    DNA can be fed in as chunks of any size; matches which run across
+    the end of one chunk and into the next are still found
+
+    feed: scan the next chunk of DNA, returning matches that end in it
+    scan: scan every chunk of DNA from an iterable, yielding matches
+    find_all_starts: find all start indexes of every pattern in a string
+    reset: go back to the start of a new DNA string
+
+    read-only attributes: pats
+    """
+
+    def __init__(self, pats: list, allow_rev_comp: bool=False):
+        """Build the automaton for a group of patterns
+
+        :param pats: the DNA patterns to search for
+        :type pats: list (of strs)
+        :param allow_rev_comp: whether to also match reverse complements,
+                               reported as the pattern itself
+                               (default of False)
+        :type allow_rev_comp: bool
+        """
+
+        if not pats:
+            raise ValueError('Cannot search for no patterns')
+        self._pats = list(pats)
+        # one row of next states per state, columns in BASES order
+        self._goto = [[-1, -1, -1, -1]]
+        # (pattern, pattern length) pairs which end at each state
+        self._outputs = [[]]
+        for pat in self._pats:
+            self._insert(pat, pat)
+            if allow_rev_comp:
+                rev = rev_comp(pat)
+                if rev != pat:
+                    self._insert(rev, pat)
+        self._link()
+        self.reset()
+
+    def _insert(self, pat: str, report: str):
+        """Add a path through the automaton for one pattern
+
+        :param pat: the DNA string to spell out
+        :type pat: str
+        :param report: the pattern to report when pat is matched
+        :type report: str
+        """
+
+        if not pat:
+            raise ValueError('Cannot search for empty string')
+        state = 0
+        for base in pat:
+            try:
+                num = BASE_NUM[base]
+            except KeyError:
+                raise ValueError('Non-DNA base "' + base + '" in given string')
+            if self._goto[state][num] == -1:
+                self._goto[state][num] = len(self._goto)
+                self._goto.append([-1, -1, -1, -1])
+                self._outputs.append([])
+            state = self._goto[state][num]
+        if (report, len(pat)) not in self._outputs[state]:
+            self._outputs[state].append((report, len(pat)))
+
+    def _link(self):
+        """Fill in failure transitions so every state has 4 next states"""
+
+        fail = [0 for _ in range(len(self._goto))]
+        queue = deque()
+        root = self._goto[0]
+        for num in range(4):
+            if root[num] == -1:
+                root[num] = 0
+            else:
+                queue.append(root[num])
+        # breadth-first, so shorter states are finished before longer ones
+        while queue:
+            state = queue.popleft()
+            # matches ending at the longest proper suffix also end here
+            for output in self._outputs[fail[state]]:
+                if output not in self._outputs[state]:
+                    self._outputs[state].append(output)
+            row = self._goto[state]
+            fail_row = self._goto[fail[state]]
+            for num in range(4):
+                if row[num] == -1:
+                    row[num] = fail_row[num]
+                else:
+                    fail[row[num]] = fail_row[num]
+                    queue.append(row[num])
+
+    @property
+    def pats(self) -> list:
+        return list(self._pats)
+
+    def reset(self):
+        """Go back to the start of a new DNA string"""
+        self._state = 0
+        self._offset = 0
+
+    def feed(self, chunk) -> list:
+        """Scan the next chunk of DNA
+
+        :param chunk: the DNA that follows everything fed in so far
+        :type chunk: str or bytes-like
+        :returns: (start index, pattern) for every match ending in chunk,
+                  with start indexes counted from the first chunk
+        :rtype: list (of tuples (int, str))
+        """
+
+        goto = self._goto
+        outputs = self._outputs
+        state = self._state
+        matches = []
+        # encoding fails on any non-DNA base
+        nums = encode(chunk)
+        for i, num in enumerate(nums):
+            state = goto[state][num]
+            if outputs[state]:
+                end = self._offset + i + 1
+                for pat, pat_len in outputs[state]:
+                    matches.append((end - pat_len, pat))
+        self._state = state
+        self._offset += len(nums)
+        return matches
+
+    def scan(self, chunks):
+        """Scan every chunk of DNA from an iterable, starting afresh
+
+        :param chunks: consecutive pieces of one DNA string
+        :type chunks: iterable (of strs or bytes-likes)
+        :returns: (start index, pattern) for every match, in order of
+                  where the match ends
+        :rtype: generator (of tuples (int, str))
+        """
+
+        self.reset()
+        for chunk in chunks:
+            yield from self.feed(chunk)
+
+    def find_all_starts(self, DNA) -> dict:
+        """Find all start indexes of every pattern
+
+        :param DNA: the longer string to search in
+        :type DNA: str or bytes-like
+        :returns: all indexes where each pattern starts in DNA
+        :rtype: dict (strs: lists (of ints))
+        """
+
+        if not DNA:
+            raise ValueError('Cannot search in empty string')
+        starts = {pat: [] for pat in self._pats}
+        for start, pat in self.scan([DNA]):
+            starts[pat].append(start)
+        for pat in starts:
+            starts[pat].sort()
+        return starts
@@ -1,6 +1,31 @@
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing.shared_memory import SharedMemory
+from operator import ne
+import os
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from fasta import read_records
+from seq_utils import (BASE_NUM, check_DNA, code_to_pat, iter_canonical_codes,
+                       iter_kmer_codes, iter_neighbors, kmer_codes, rev_comp,
+                       rev_comp_code, sub_masks, window_dists)
+from skew import chunked, skew_extremes
+from twobit import TwoBitGenome
+
 BASES = ('A', 'C', 'G', 'T')
-# matches bases with their complements
-COMP = {'A':'T', 'C':'G', 'G':'C', 'T':'A'}
+# seeds shorter than this match too often to be worth searching for
+MIN_SEED_LEN = 4
+# strings that can be searched directly; others are searched in chunks
+SEARCHABLE = (str, bytes, bytearray)
+# the number of starts searched at a time in other strings
+CHUNK_SIZE = 1 << 20
+# the number of chunks handed to each worker when counting in parallel,
+# so that workers which finish early can pick up more
+CHUNKS_PER_WORKER = 4
 
 def DNA_to_num(DNA: str) -> int:
     """Converts a DNA string to a number
@@ -66,35 +91,45 @@ def find_starts(DNA: str, pat: str) -> list:
         raise ValueError('Cannot search in empty string')
     if not pat:
         raise ValueError('Cannot search for empty string')
+    # records read from files hold their DNA as bytes
+    if isinstance(pat, str) and not isinstance(DNA, str):
+        pat = pat.encode('ascii')
     pat_len = len(pat)
     DNA_len = len(DNA)
     if pat_len > DNA_len:
         return []
+    if not isinstance(DNA, SEARCHABLE):
+        return _search_chunks(find_starts, DNA, pat)
     starts = []
-    # only search possible starting positions
-    for i in range(DNA_len - pat_len + 1):
-        if DNA[i:i + pat_len] == pat:
-            starts.append(i)
+    # each search picks up one past the last match, so overlaps are found
+    start = DNA.find(pat)
+    while start != -1:
+        starts.append(start)
+        start = DNA.find(pat, start + 1)
     return starts
 
-def rev_comp(pat: str) -> str:
-    """Finds the reverse complement of a DNA string
+def _search_chunks(search, DNA, pat, *args) -> list:
+    """Runs a search over a long DNA string one overlapping chunk at a time
 
-    :param pat: the DNA string to REVerse COMPlement
-    :type pat: str
-    :returns: the reverse complement of pat
-    :rtype: str
+    :param search: the search to run, taking (chunk, pat, *args)
+    :type search: function
+    :param DNA: the longer string to search in
+    :type DNA: anything that can be sliced, e.g. a TwoBitGenome
+    :param pat: the substring to search for
+    :type pat: str or bytes
+    :param args: any more arguments for search
+    :returns: all start indexes found in DNA, in order
+    :rtype: list
     """
 
-    if not pat:
-        raise ValueError('Cannot reverse-complement empty string')
-    rev = ''
-    for base in pat:
-        try:
-            rev = COMP.get(base) + rev
-        except TypeError:
-            raise ValueError('Non-DNA base "' + base + '" in given string')
-    return rev
+    starts = []
+    # chunks overlap so that each start is searched from exactly one chunk
+    for offset in range(0, len(DNA) - len(pat) + 1, CHUNK_SIZE):
+        chunk = DNA[offset:offset + CHUNK_SIZE + len(pat) - 1]
+        if not isinstance(chunk, SEARCHABLE):
+            chunk = bytes(chunk)
+        starts += [offset + start for start in search(chunk, pat, *args)]
+    return starts
 
 def min_skew(DNA: str) -> list:
     """Finds all indexes of minimum skew in a DNA string
@@ -109,22 +144,7 @@ def min_skew(DNA: str) -> list:
     
     if not DNA:
         raise ValueError('Cannot search in empty string')
-    mins = []
-    min_skew = 0
-    skew = 0
-    for i in range(len(DNA)):
-        if DNA[i] == 'C':
-            skew -= 1
-        elif DNA[i] == 'G':
-            skew += 1
-        elif DNA[i] != 'A' and DNA[i] != 'T':
-            raise ValueError('Non-DNA base "' + DNA[i] + '" in given string')
-        if skew < min_skew:
-            min_skew = skew
-            mins = [i]
-        elif skew == min_skew:
-            mins.append(i)
-    return mins
+    return skew_extremes(chunked(DNA))[1]
 
 def ham_dist(one: str, two: str) -> int:
     """Calculates HAMming DISTance between two strings
@@ -149,26 +169,135 @@ def ham_dist(one: str, two: str) -> int:
             dist += 1
     return dist
 
-def calc_freq(DNA: str, pat_len: int) -> list:
+def _chunk_counts(source: tuple, start: int, stop: int, pat_len: int,
+                  canonical: bool) -> Counter:
+    """Counts the substrings starting in one range of a shared DNA string
+
+    Runs in a worker process, which reads only its own range
+
+    :param source: ('shm', name) for a shared memory block of ASCII
+                   bases, or ('2bit', path) for a 2-bit genome file
+    :type source: tuple (str, str)
+    :param start: the first starting position to count
+    :type start: int
+    :param stop: the starting position after the last to count
+    :type stop: int
+    :param pat_len: the length of substrings to count
+    :type pat_len: int
+    :param canonical: whether to count canonical numbers
+    :type canonical: bool
+    :returns: the number of each substring in the range
+    :rtype: Counter (of ints)
+    """
+
+    kind, name = source
+    # substrings starting before stop may run pat_len - 1 bases past it
+    end = stop + pat_len - 1
+    if kind == 'shm':
+        shared = SharedMemory(name)
+        try:
+            chunk = bytes(shared.buf[start:end])
+        finally:
+            shared.close()
+    else:
+        with TwoBitGenome(name) as genome:
+            chunk = genome[start:end]
+    codes = iter_canonical_codes if canonical else iter_kmer_codes
+    return Counter(codes(chunk, pat_len))
+
+def _pool_counts(source: tuple, num_starts: int, pat_len: int,
+                 canonical: bool, workers: int) -> Counter:
+    """Counts the substrings of a shared DNA string across worker processes
+
+    :param source: where workers can find the DNA string (see _chunk_counts)
+    :type source: tuple (str, str)
+    :param num_starts: the number of substring starts in the string
+    :type num_starts: int
+    :param pat_len: the length of substrings to count
+    :type pat_len: int
+    :param canonical: whether to count canonical numbers
+    :type canonical: bool
+    :param workers: the number of processes to count in
+    :type workers: int
+    :returns: the number of each substring in the string
+    :rtype: Counter (of ints)
+    """
+
+    chunk_size = -(-num_starts // (workers * CHUNKS_PER_WORKER))
+    starts = range(0, num_starts, chunk_size)
+    stops = [min(start + chunk_size, num_starts) for start in starts]
+    counts = Counter()
+    with ProcessPoolExecutor(workers) as pool:
+        for part in pool.map(_chunk_counts, repeat(source), starts, stops,
+                             repeat(pat_len), repeat(canonical)):
+            counts.update(part)
+    return counts
+
+def count_codes(DNA, pat_len: int, canonical: bool = False,
+                workers: int = 1) -> Counter:
+    """Counts the number of every substring of a certain length
+
+    With more than one worker, the string is split into chunks which
+    overlap by pat_len - 1 bases, counted in separate processes and
+    merged. Workers read the string from shared memory (or straight
+    from the file of a TwoBitGenome), so it is never copied per chunk
+
+    :param DNA: the longer string to search in
+    :type DNA: str or bytes-like, or a TwoBitGenome
+    :param pat_len: the length of substrings to count
+    :type pat_len: int
+    :param canonical: whether to count canonical numbers, putting each
+                      substring together with its rev-comp (default False)
+    :type canonical: bool
+    :param workers: the number of processes to count in (default 1)
+    :type workers: int
+    :returns: the number of times each substring's number appears
+    :rtype: Counter (of ints)
+    """
+
+    if not DNA:
+        raise ValueError('Cannot search in empty string')
+    if pat_len < 1:
+        raise ValueError('Patterns must have length at least 1')
+    if workers < 1:
+        raise ValueError('Must count with at least 1 worker')
+    num_starts = len(DNA) - pat_len + 1
+    if workers == 1 or num_starts < 2:
+        codes = iter_canonical_codes if canonical else iter_kmer_codes
+        return Counter(codes(DNA, pat_len))
+    if isinstance(DNA, TwoBitGenome):
+        return _pool_counts(('2bit', DNA.path), num_starts, pat_len,
+                            canonical, workers)
+    check_DNA(DNA)
+    if isinstance(DNA, str):
+        DNA = DNA.encode('ascii')
+    shared = SharedMemory(create=True, size=len(DNA))
+    try:
+        shared.buf[:len(DNA)] = DNA
+        return _pool_counts(('shm', shared.name), num_starts, pat_len,
+                            canonical, workers)
+    finally:
+        shared.close()
+        shared.unlink()
+
+def calc_freq(DNA: str, pat_len: int, workers: int = 1) -> list:
     """Calculates the number of times each string of a certain length appears
 
     :param DNA: the longer string to search in
     :type DNA: str
     :param pat_len: the length of substrings to count
     :type pat_len: int
+    :param workers: the number of processes to count in (default 1)
+    :type workers: int
     :returns: a list where [i] is the times the string num_to_DNA(i, pat_len)
               appears
     :rtype: list
     """
     
-    if not DNA:
-        raise ValueError('Cannot search in empty string')
-    if pat_len < 1:
-        raise ValueError('Patterns must have length at least 1')
+    counts = count_codes(DNA, pat_len, workers=workers)
     freq = [0 for _ in range(4 ** pat_len)]
-    # search all starting positions
-    for i in range(len(DNA) - pat_len + 1):
-        freq[DNA_to_num(DNA[i:i + pat_len])] += 1
+    for code, num in counts.items():
+        freq[code] = num
     return freq
 
 def find_most_freq(DNA: str, pat_len: int, min_times: int = 2,
@@ -206,6 +335,9 @@ def find_clumps(DNA: str, pat_len: int, min_times: int,
                 window_len: int) -> list:
     """Find substrings which appear with enough frequency in a restricted window
 
+    Slides a single window along the string, counting substrings as they
+    enter and leave it, so the whole string is only passed over once
+
     :param DNA: the longer string to search in
     :type DNA: str
     :param pat_len: the length of substrings to find
@@ -225,21 +357,57 @@ def find_clumps(DNA: str, pat_len: int, min_times: int,
     if window_len < pat_len + min_times:
         raise ValueError('Window is not long enough to accomadate the '
                          + 'minimum number of patterns')
-    freq_pats = find_most_freq(DNA, pat_len, min_times, True)
-    clumped = []
-    for pat in freq_pats:
-        starts = find_starts(DNA, pat)
-        for i in range(len(starts) - min_times + 1):
-            # check distance of patterns from each other
-            if (starts[i + min_times - 1] - starts[i]
-                < window_len - pat_len + 1):
-                clumped.append(pat)
-                break
-    return clumped
+    if min_times < 2:
+        raise ValueError('Minimum number of appearances must be >=2')
+    # number of substring starts that fit in one window
+    per_window = window_len - pat_len + 1
+    freq = [0 for _ in range(4 ** pat_len)]
+    window = deque()
+    clumped = set()
+    for code in iter_kmer_codes(DNA, pat_len):
+        # the substring starting here enters the window...
+        window.append(code)
+        freq[code] += 1
+        if freq[code] >= min_times:
+            clumped.add(code)
+        # ...and the one a window-length back leaves it
+        if len(window) == per_window:
+            freq[window.popleft()] -= 1
+    return [num_to_DNA(code, pat_len) for code in sorted(clumped)]
+
+def split_seeds(pat: str, dist: int) -> list:
+    """Splits a pattern into dist + 1 nearly-equal seeds
+
+    Any approximate match with at most dist substitutions must match at
+    least one seed exactly, since there are more seeds than substitutions
+
+    :param pat: the pattern to split
+    :type pat: str
+    :param dist: the maximum number of substitutions to allow
+    :type dist: int
+    :returns: (offset in pat, seed) for each seed
+    :rtype: list (of tuples (int, str))
+    """
+
+    if not pat:
+        raise ValueError('Cannot split empty string')
+    if dist < 0:
+        raise ValueError('Cannot use a negative distance')
+    if dist >= len(pat):
+        raise ValueError('Too many substitutions to split pattern into seeds')
+    num_seeds = dist + 1
+    pat_len = len(pat)
+    bounds = [(pat_len * i) // num_seeds for i in range(num_seeds + 1)]
+    return [(bounds[i], pat[bounds[i]:bounds[i + 1]])
+            for i in range(num_seeds)]
 
 def find_approx_starts(DNA: str, pat: str, dist: int) -> list:
     """Find all start indexes of an approximate substring
 
+    Only positions where one of the pattern's seeds matches exactly are
+    checked in full, instead of every position in DNA. Patterns too short
+    to seed are compared against all windows at once
+
     :param DNA: the longer string to search in
     :type DNA: str
     :param pattern: the substring to search for
@@ -258,13 +426,29 @@ def find_approx_starts(DNA: str, pat: str, dist: int) -> list:
         raise ValueError('Cannot search in empty string')
     if not pat:
         raise ValueError('Cannot search for empty string')
-    starts = []
+    # records read from files hold their DNA as bytes
+    if isinstance(pat, str) and not isinstance(DNA, str):
+        pat = pat.encode('ascii')
     pat_len = len(pat)
-    # only search possible starting positions
-    for i in range(len(DNA) - len(pat) + 1):
-        if ham_dist(DNA[i:i + pat_len], pat) <= dist:
-            starts.append(i)
-    return starts
+    last_start = len(DNA) - pat_len
+    # every position is close enough if every base may be substituted
+    if dist >= pat_len:
+        return list(range(last_start + 1))
+    if not isinstance(DNA, SEARCHABLE):
+        return _search_chunks(find_approx_starts, DNA, pat, dist)
+    # short seeds would hit nearly everywhere, so compare every window at once
+    if pat_len // (dist + 1) < MIN_SEED_LEN:
+        return [i for i, cur_dist in enumerate(window_dists(DNA, pat))
+                if cur_dist <= dist]
+    candidates = set()
+    for offset, seed in split_seeds(pat, dist):
+        hit = DNA.find(seed, offset, last_start + offset + len(seed))
+        while hit != -1:
+            candidates.add(hit - offset)
+            hit = DNA.find(seed, hit + 1, last_start + offset + len(seed))
+    # verify each candidate with a full count of mismatches
+    return [start for start in sorted(candidates)
+            if sum(map(ne, DNA[start:start + pat_len], pat)) <= dist]
 
 def get_neighbors(pat: str, dist: int) -> list:
     """Finds all neighbors of a DNA string
@@ -284,45 +468,16 @@ def get_neighbors(pat: str, dist: int) -> list:
         raise ValueError('Cannot find neighbors of empty string')
     if dist < 0:
         raise ValueError('Cannot have a negative distance')
-    # dist of 0 means no changes
-    if dist == 0:
-        return [pat]
-    if len(pat) == 1:
-        return list(BASES)
-    # lists of strings currently 0, 1, 2, .... d differences from pat
-    neighbors = [[] for _ in range(dist + 1)]
-    # build off empty string
-    neighbors[0] = ['']
-    # add on new chars to each existing string one at a time
-    for i in range(len(pat)):
-        old = list(neighbors)
-        neighbors = [[] for _ in range(dist + 1)]
-        correct = pat[i]
-        try:
-            BASES.index(correct)
-        except ValueError:
-            raise ValueError('Non-DNA base "' + correct + '" in given string')
-        # loop over all dist-lists
-        for cur_dist in range(dist + 1):
-            for cur_pat in old[cur_dist]:
-                # using the correct char does not move back a list
-                neighbors[cur_dist].append(cur_pat + correct)
-                if cur_dist < dist:
-                    for base in BASES:
-                        if base != correct:
-                            # using incorrect char does move back a list
-                            neighbors[cur_dist + 1].append(cur_pat + base)
-    # group together in one list
-    all_neighbors = []
-    for group in neighbors:
-        for neighbor in group:
-            all_neighbors.append(neighbor)
-    return all_neighbors
+    return list(iter_neighbors(pat, dist))
 
 def find_most_approx_freq(DNA: str, pat_len: int, dist: int,
-                          allow_rev_comp: bool = False) -> list:
+                          allow_rev_comp: bool = False,
+                          workers: int = 1) -> list:
     """Find substrings which appear with enough frequency, with mismatches
 
+    Exact substrings are counted first, then each distinct one passes
+    its count on to all of its neighbors at once
+
     :param DNA: the longer string to search in
     :type DNA: str
     :param pat_len: the length of substrings to find
@@ -332,51 +487,67 @@ def find_most_approx_freq(DNA: str, pat_len: int, dist: int,
     :param allow_rev_comp: whether to count reverse complements together
                            (default of False)
     :type allow_rev_comp: bool
+    :param workers: the number of processes to count exact substrings
+                    in (default 1)
+    :type workers: int
     :returns: all most frequent substrings with rules specified above
     :rtype: list
     """
     
     if dist == 0:
         return find_most_freq(DNA, pat_len)
+    if dist < 0:
+        raise ValueError('Cannot have a negative distance')
     if pat_len < 1:
         raise ValueError('Patterns must have length at least 1')
     if not DNA:
         raise ValueError('Cannot search in empty string')
     if len(DNA) < pat_len:
         raise ValueError('Cannot search for patterns longer than the string')
-    # build up frequency map
-    freq = {}
-    for i in range(len(DNA) - pat_len + 1):
-        pat = DNA[i: i + pat_len]
-        # add ALL neighbors up 1
-        for neighbor in get_neighbors(pat, dist):
-            try:
-                freq[neighbor] += 1
-            except KeyError:
-                freq[neighbor] = 1
-    freq_pats = []
+    masks = sub_masks(pat_len, dist)
+    freq = defaultdict(int)
+    if not allow_rev_comp:
+        # count exact substrings first, so repeats are only expanded once
+        for code, num in count_codes(DNA, pat_len,
+                                     workers=workers).items():
+            # then pass each count on to all its neighbors
+            for mask in masks:
+                freq[code ^ mask] += num
+    else:
+        # substrings & their rev-comps are counted together, once per pair
+        for code, num in count_codes(DNA, pat_len, True, workers).items():
+            # each window has a neighbor on both strands
+            for strand in (code, rev_comp_code(code, pat_len)):
+                for mask in masks:
+                    freq[strand ^ mask] += num
+        # only palindromes can be their own rev-comp, which is not
+        # counted twice
+        if pat_len % 2 == 0:
+            for code in freq:
+                if rev_comp_code(code, pat_len) == code:
+                    freq[code] //= 2
+    freq_codes = []
     best_freq = 0
-    for pat, num in freq.items():
-        # add rev-comp if allowed and re-comp is different
-        if allow_rev_comp:
-            try:
-                rev = rev_comp(pat)
-                if rev != pat:
-                    num += freq[rev_comp(pat)]
-            except KeyError:
-                pass
+    for code, num in freq.items():
         if num > best_freq:
-            freq_pats = [pat]
+            freq_codes = [code]
             best_freq = num
         elif num == best_freq:
-            freq_pats.append(pat)
-    return freq_pats
+            freq_codes.append(code)
+    return [code_to_pat(code, pat_len) for code in freq_codes]
 
 if __name__ == '__main__':
-    # read in parameters
-    with open('data.txt') as data:
-        DNA = data.readline().rstrip()
-        pat_len, dist = [int(x) for x in data.readline().split()]
-    # print all results
-    for pat in find_most_approx_freq(DNA, pat_len, dist, True):
-        print(pat, end=' ')
+    if len(sys.argv) == 4:
+        # a FASTA/FASTQ file & parameters, streamed one record at a time
+        pat_len, dist = int(sys.argv[2]), int(sys.argv[3])
+        for record in read_records(sys.argv[1]):
+            print(record.name + ':', end=' ')
+            print(*find_most_approx_freq(record.seq, pat_len, dist, True))
+    else:
+        # read in parameters
+        with open('data.txt') as data:
+            DNA = data.readline().rstrip()
+            pat_len, dist = [int(x) for x in data.readline().split()]
+        # print all results
+        for pat in find_most_approx_freq(DNA, pat_len, dist, True):
+            print(pat, end=' ')
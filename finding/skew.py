@@ -0,0 +1,175 @@
+from array import array
+from itertools import accumulate
+import os
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from seq_utils import check_DNA
+
+# translates G to +1 and C to -1 (as a signed byte), A & T to 0
+_SKEW_TABLE = bytes.maketrans(b'ACGT', b'\x00\xff\x01\x00')
+
+def chunked(DNA, chunk_size: int=1 << 20):
+    """Splits a DNA string into consecutive chunks
+
+    :param DNA: the DNA string to split
+    :type DNA: str or bytes-like (anything that can be sliced)
+    :param chunk_size: the number of bases in each chunk (default 2^20)
+    :type chunk_size: int
+    :returns: consecutive pieces of DNA
+    :rtype: generator (of strs or bytes)
+    """
+
+    if chunk_size < 1:
+        raise ValueError('Chunks must be at least 1 base long')
+    for start in range(0, len(DNA), chunk_size):
+        yield DNA[start:start + chunk_size]
+
+def _skews(chunk, skew: int) -> list:
+    """Calculates the running skew after each base of one chunk
+
+    :param chunk: a piece of a DNA string
+    :type chunk: str or bytes-like
+    :param skew: the skew before the first base of chunk
+    :type skew: int
+    :returns: a list where [i] is the skew after chunk[i]
+    :rtype: list (of ints)
+    """
+
+    check_DNA(chunk)
+    if isinstance(chunk, str):
+        chunk = chunk.encode('ascii')
+    steps = array('b', bytes(chunk).translate(_SKEW_TABLE))
+    return list(accumulate(steps, initial=skew))[1:]
+
+def _indexes(values: list, value: int, offset: int) -> list:
+    """Finds all indexes of a value in a list
+
+    :param values: the list to search in
+    :type values: list
+    :param value: the value to search for
+    :type value: int
+    :param offset: an amount to add to every index
+    :type offset: int
+    :returns: all indexes of value, plus offset
+    :rtype: list (of ints)
+    """
+
+    indexes = []
+    try:
+        i = values.index(value)
+        while True:
+            indexes.append(offset + i)
+            i = values.index(value, i + 1)
+    except ValueError:
+        return indexes
+
+def skew_extremes(chunks) -> (int, list, int, list):
+    """Finds the lowest & highest skew of a DNA string, and where they are
+
+    'Skew' is #G - #C so far, starting at 0. Only one chunk is held in
+    memory at a time
+
+    :param chunks: consecutive pieces of one DNA string
+    :type chunks: iterable (of strs or bytes-likes)
+    :returns: the minimum skew, all indexes where it is reached, the
+              maximum skew, and all indexes where it is reached
+    :rtype: tuple (int, list (of ints), int, list (of ints))
+    """
+
+    min_skew = max_skew = skew = 0
+    mins = []
+    maxes = []
+    offset = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        skews = _skews(chunk, skew)
+        low = min(skews)
+        if low < min_skew:
+            min_skew, mins = low, []
+        if low == min_skew:
+            mins += _indexes(skews, low, offset)
+        high = max(skews)
+        if high > max_skew:
+            max_skew, maxes = high, []
+        if high == max_skew:
+            maxes += _indexes(skews, high, offset)
+        skew = skews[-1]
+        offset += len(skews)
+    if not offset:
+        raise ValueError('Cannot find skew of empty string')
+    return min_skew, mins, max_skew, maxes
+
+def skew_profile(chunks, window: int=1) -> list:
+    """Calculates the skew of a DNA string every window bases
+
+    :param chunks: consecutive pieces of one DNA string
+    :type chunks: iterable (of strs or bytes-likes)
+    :param window: the number of bases between each skew kept (default 1)
+    :type window: int
+    :returns: a list where [i] is the skew after the first
+              (i + 1) * window bases, plus the final skew if the string
+              does not end on a whole window
+    :rtype: list (of ints)
+    """
+
+    if window < 1:
+        raise ValueError('Windows must be at least 1 base long')
+    profile = []
+    skew = 0
+    offset = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        skews = _skews(chunk, skew)
+        # first index in this chunk which ends a window
+        profile += skews[(window - 1 - offset) % window::window]
+        skew = skews[-1]
+        offset += len(skews)
+    if not offset:
+        raise ValueError('Cannot find skew of empty string')
+    if offset % window:
+        profile.append(skew)
+    return profile
+
+def gc_content(chunks, window: int) -> list:
+    """Calculates the fraction of G & C bases in each window of a DNA string
+
+    :param chunks: consecutive pieces of one DNA string
+    :type chunks: iterable (of strs or bytes-likes)
+    :param window: the number of bases in each window
+    :type window: int
+    :returns: a list where [i] is the GC fraction of the (i + 1)th
+              non-overlapping window, including a shorter last window
+    :rtype: list (of floats)
+    """
+
+    if window < 1:
+        raise ValueError('Windows must be at least 1 base long')
+    content = []
+    # G & C seen so far in the current window, and its length so far
+    num_GC = 0
+    filled = 0
+    for chunk in chunks:
+        check_DNA(chunk)
+        if isinstance(chunk, str):
+            chunk = chunk.encode('ascii')
+        chunk = bytes(chunk)
+        start = 0
+        while start < len(chunk):
+            end = min(start + window - filled, len(chunk))
+            num_GC += chunk.count(b'G', start, end) + chunk.count(b'C',
+                                                                  start, end)
+            filled += end - start
+            if filled == window:
+                content.append(num_GC / window)
+                num_GC = filled = 0
+            start = end
+    if filled:
+        content.append(num_GC / filled)
+    if not content:
+        raise ValueError('Cannot find GC content of empty string')
+    return content
@@ -0,0 +1,216 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import ne
+import os
+import struct
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from freq_finder import split_seeds
+from seq_utils import encode
+
+# marks the start of a saved index file
+MAGIC = b'SUFA'
+# magic, array typecode, DNA length
+HEADER = struct.Struct('<4scQ')
+
+class SuffixArray:
+    """A reusable index of every suffix of a DNA string, in sorted order
+
+    Built once per string, after which any pattern can be searched for
+    with a binary search instead of a scan of the whole string
+
+    find_starts: find all start indexes of a substring
+    find_all_starts: find all start indexes of many substrings
+    find_approx_starts: find all start indexes of an approximate substring
+    save: write the index to a file
+    load: read an index back from a file (classmethod)
+
+    read-only attributes: DNA
+    """
+
+    def __init__(self, DNA, suffixes: array=None):
+        """Sort all suffixes of DNA, unless they were already sorted
+
+        :param DNA: the DNA string to index
+        :type DNA: str or bytes-like
+        :param suffixes: start indexes of DNA's suffixes in sorted order,
+                         as read back from a saved index (default None)
+        :type suffixes: array (of ints)
+        """
+
+        if not DNA:
+            raise ValueError('Cannot index empty string')
+        if not isinstance(DNA, str):
+            # patterns are searched for as strs
+            DNA = bytes(DNA).decode('latin-1')
+        self._DNA = DNA
+        if suffixes is None:
+            suffixes = self._sort_suffixes(DNA)
+        elif len(suffixes) != len(DNA):
+            raise ValueError('Suffix array does not match DNA string')
+        self._suffixes = suffixes
+
+    @staticmethod
+    def _sort_suffixes(DNA: str) -> array:
+        """Sort all suffixes by doubling the length of prefix compared
+
+        :param DNA: the DNA string to index
+        :type DNA: str
+        :returns: start indexes of DNA's suffixes in sorted order
+        :rtype: array (of ints)
+        """
+
+        DNA_len = len(DNA)
+        # encoding fails on any non-DNA base
+        rank = list(encode(DNA))
+        suffixes = list(range(DNA_len))
+        span = 1
+        while True:
+            # suffixes running off the end sort before any base
+            def key(i: int) -> int:
+                after = rank[i + span] + 1 if i + span < DNA_len else 0
+                return rank[i] * (DNA_len + 1) + after
+            suffixes.sort(key=key)
+            new_rank = [0 for _ in range(DNA_len)]
+            last_key = key(suffixes[0])
+            for j in range(1, DNA_len):
+                cur_key = key(suffixes[j])
+                new_rank[suffixes[j]] = new_rank[suffixes[j - 1]]
+                if cur_key != last_key:
+                    new_rank[suffixes[j]] += 1
+                last_key = cur_key
+            rank = new_rank
+            # all ranks are different once every suffix is told apart
+            if rank[suffixes[-1]] == DNA_len - 1:
+                break
+            span *= 2
+        return array('I' if DNA_len < 2 ** 32 else 'Q', suffixes)
+
+    @property
+    def DNA(self) -> str:
+        return self._DNA
+
+    def __len__(self) -> int:
+        return len(self._DNA)
+
+    def _bounds(self, pat: str) -> (int, int):
+        """Find the block of sorted suffixes that start with a pattern
+
+        :param pat: the substring to search for
+        :type pat: str
+        :returns: the first and one-past-last suffix array positions
+        :rtype: tuple (int, int)
+        """
+
+        pat_len = len(pat)
+        DNA = self._DNA
+        def prefix(i: int) -> str:
+            return DNA[i:i + pat_len]
+        low = bisect_left(self._suffixes, pat, key=prefix)
+        high = bisect_right(self._suffixes, pat, low, key=prefix)
+        return low, high
+
+    def find_starts(self, pat) -> list:
+        """Find all start indexes of a substring
+
+        :param pat: the substring to search for
+        :type pat: str or bytes-like
+        :returns: all indexes where pat starts in the indexed DNA
+        :rtype: list
+        """
+
+        if not pat:
+            raise ValueError('Cannot search for empty string')
+        if not isinstance(pat, str):
+            # suffixes are compared as strs
+            pat = bytes(pat).decode('latin-1')
+        if len(pat) > len(self._DNA):
+            return []
+        low, high = self._bounds(pat)
+        return sorted(self._suffixes[low:high])
+
+    def find_all_starts(self, pats: list) -> dict:
+        """Find all start indexes of many substrings
+
+        :param pats: the substrings to search for
+        :type pats: list (of strs)
+        :returns: the start indexes of each substring
+        :rtype: dict (strs: lists (of ints))
+        """
+
+        return {pat: self.find_starts(pat) for pat in pats}
+
+    def find_approx_starts(self, pat, dist: int) -> list:
+        """Find all start indexes of an approximate substring
+
+        Exact matches of the pattern's seeds are looked up in the index,
+        and only those candidates are checked in full
+
+        :param pat: the substring to search for
+        :type pat: str or bytes-like
+        :param dist: the maximum number of substitutions to allow
+        :type dist: int
+        :returns: all indexes where pat approximately starts in the DNA
+        :rtype: list
+        """
+
+        if dist < 0:
+            raise ValueError('Cannot use a negative distance')
+        if not pat:
+            raise ValueError('Cannot search for empty string')
+        if not isinstance(pat, str):
+            pat = bytes(pat).decode('latin-1')
+        pat_len = len(pat)
+        last_start = len(self._DNA) - pat_len
+        if dist >= pat_len:
+            return list(range(last_start + 1))
+        candidates = set()
+        for offset, seed in split_seeds(pat, dist):
+            low, high = self._bounds(seed)
+            for hit in self._suffixes[low:high]:
+                if 0 <= hit - offset <= last_start:
+                    candidates.add(hit - offset)
+        DNA = self._DNA
+        return [start for start in sorted(candidates)
+                if sum(map(ne, DNA[start:start + pat_len], pat)) <= dist]
+
+    def save(self, path: str):
+        """Write the index to a file, to be read back with load
+
+        :param path: the file to write to
+        :type path: str
+        """
+
+        suffixes = array(self._suffixes.typecode, self._suffixes)
+        # files are always little-endian
+        if sys.byteorder == 'big':
+            suffixes.byteswap()
+        with open(path, mode='wb') as output:
+            output.write(HEADER.pack(MAGIC, suffixes.typecode.encode(),
+                                     len(self._DNA)))
+            output.write(self._DNA.encode('ascii'))
+            suffixes.tofile(output)
+
+    @classmethod
+    def load(cls, path: str):
+        """Read an index back from a file written by save
+
+        :param path: the file to read from
+        :type path: str
+        :returns: the saved index
+        :rtype: SuffixArray
+        """
+
+        with open(path, mode='rb') as data:
+            magic, typecode, DNA_len = HEADER.unpack(data.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError('File is not a saved suffix array')
+            DNA = data.read(DNA_len).decode('ascii')
+            suffixes = array(typecode.decode())
+            suffixes.fromfile(data, DNA_len)
+        if sys.byteorder == 'big':
+            suffixes.byteswap()
+        return cls(DNA, suffixes)
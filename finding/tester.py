@@ -1,4 +1,10 @@
+import aho_corasick
 import freq_finder
+import os
+import skew
+import suffix_array
+import tempfile
+import twobit
 import unittest
 
 class Tester(unittest.TestCase):
@@ -23,12 +29,22 @@ class Tester(unittest.TestCase):
 
     # test cases for find_clumps
     known_clumps = (('AGCATGATGTGACAGTAC', 2, 3, 8, ['TG']),
-                    ('ATAATGCTGTGACATTAT', 2, 3, 8, ['TG']))
+                    ('ATAATGCTGTGACATTAT', 2, 3, 8, ['TG']),
+                    ('CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGA'
+                     + 'AGAGAAGAGGAAACATTGTAA', 5, 4, 50, ['CGACA', 'GAAGA']),
+                    ('AAAACAAAA', 4, 2, 8, []))
 
     # test cases for rev_comp
     known_rev_comp = (('AAAACCCGGT', 'ACCGGGTTTT'),
                       ('ACACAC', 'GTGTGT'))
 
+    # test cases for min_skew
+    known_min_skew = (('TAAAGACTGCCGAGAGGCCAACACGAGTGCTAGAACGAGGGGCGTAAACGCG'
+                       + 'GGTCCGAT', [10, 23]),
+                      ('CCGGCCGG', [1, 5]),
+                      ('GGAT', []),
+                      ('ATAT', [0, 1, 2, 3]))
+
     # test cases for find_approx_starts
     known_approx_starts = (('CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCAC'
                             + 'GGTACGGACGTCAATCAAAT', 'ATTCTGGA', 3,
@@ -61,6 +77,13 @@ class Tester(unittest.TestCase):
                            'AATT', 'CGTT', 'GTTC', 'GGTA', 'AGCA', 'CATC']),
                          ('AATTAATTGGTAGGTAGGTA', 4, 0, ['GGTA']))
 
+    # test cases for find_most_approx_freq with reverse complements
+    known_approx_freq_rev_comp = (('ACGTTGCATGTCGCATGATGCATGAGAGCT', 4, 1,
+                                   ['ACAT', 'ATGT']),
+                                  ('AAAAAAAAAA', 2, 1,
+                                   ['AA', 'AC', 'AG', 'AT', 'CA', 'CT', 'GA',
+                                    'GT', 'TA', 'TC', 'TG', 'TT']))
+
     def test_num_to_DNA_to_num(self):
         """number -> DNA string conversion should be reversible"""
 
@@ -88,6 +111,18 @@ class Tester(unittest.TestCase):
         self.assertRaises(ValueError, freq_finder.DNA_to_num, 'GAGTAB')
         self.assertRaises(ValueError, freq_finder.DNA_to_num, 'BGAGCA')
 
+    def test_kmer_codes(self):
+        """Rolling substring numbers should match DNA_to_num"""
+
+        DNA = 'ACGTTGCATGTCGCATGATGCATGAGAGCT'
+        for pat_len in range(1, 8):
+            result = freq_finder.kmer_codes(DNA, pat_len)
+            self.assertEqual([freq_finder.DNA_to_num(DNA[i:i + pat_len])
+                              for i in range(len(DNA) - pat_len + 1)], result)
+        self.assertRaises(ValueError, freq_finder.kmer_codes, '', 2)
+        self.assertRaises(ValueError, freq_finder.kmer_codes, 'ACGT', 0)
+        self.assertRaises(ValueError, freq_finder.kmer_codes, 'ACNT', 2)
+
     def test_start_finder(self):
         """Start indicies of a substring should be collected correctly"""
 
@@ -102,6 +137,85 @@ class Tester(unittest.TestCase):
         self.assertRaises(ValueError, freq_finder.find_starts, 'A', '')
         self.assertRaises(ValueError, freq_finder.find_starts, '', 'A')
 
+    def test_suffix_array(self):
+        """Suffix array should find the same starts as a scan"""
+
+        for DNA, pattern, starts in self.known_starts:
+            index = suffix_array.SuffixArray(DNA)
+            self.assertEqual(starts, index.find_starts(pattern))
+        DNA = self.known_approx_starts[3][0]
+        index = suffix_array.SuffixArray(DNA)
+        pats = [DNA[i:i + pat_len] for pat_len in (1, 3, 6)
+                for i in range(0, len(DNA) - pat_len + 1, 7)]
+        result = index.find_all_starts(pats)
+        for pat in pats:
+            self.assertEqual(freq_finder.find_starts(DNA, pat), result[pat])
+        # bytes, as read from files, index the same as strs
+        from_bytes = suffix_array.SuffixArray(DNA.encode())
+        self.assertEqual(DNA, from_bytes.DNA)
+        self.assertEqual(result, from_bytes.find_all_starts(pats))
+        for pat in pats:
+            self.assertEqual(result[pat], index.find_starts(pat.encode()))
+        self.assertEqual(index.find_approx_starts(pats[-1], 2),
+                         index.find_approx_starts(pats[-1].encode(), 2))
+
+    def test_suffix_array_save(self):
+        """Suffix array should be unchanged after saving and loading"""
+
+        DNA = self.known_approx_starts[2][0]
+        index = suffix_array.SuffixArray(DNA)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'index.sa')
+            index.save(path)
+            loaded = suffix_array.SuffixArray.load(path)
+        self.assertEqual(DNA, loaded.DNA)
+        for pat in ('GAGCGCTGG', 'CG', 'TTTT', 'ACGTACGT'):
+            self.assertEqual(index.find_starts(pat), loaded.find_starts(pat))
+
+    def test_suffix_array_failure(self):
+        """Suffix array should error on bad input"""
+
+        self.assertRaises(ValueError, suffix_array.SuffixArray, '')
+        self.assertRaises(ValueError, suffix_array.SuffixArray, 'ACGTN')
+        self.assertRaises(ValueError, suffix_array.SuffixArray, b'ACGTN')
+        index = suffix_array.SuffixArray('ACGT')
+        self.assertRaises(ValueError, index.find_starts, '')
+
+    def test_pattern_matcher(self):
+        """Aho-Corasick matcher should find the same starts as a scan"""
+
+        DNA = self.known_approx_starts[4][0]
+        pats = ['CCGTCATCC', 'CATCC', 'TCC', 'GCATACTT', 'AAAAAAA', 'C']
+        matcher = aho_corasick.PatternMatcher(pats)
+        result = matcher.find_all_starts(DNA)
+        for pat in pats:
+            self.assertEqual(freq_finder.find_starts(DNA, pat), result[pat])
+        # feeding in uneven chunks should not lose matches across the seams
+        chunks = [DNA[i:i + 7] for i in range(0, len(DNA), 7)]
+        self.assertCountEqual([(start, pat) for pat in pats
+                               for start in result[pat]],
+                              list(matcher.scan(chunks)))
+        # bytes, as streamed from files, match the same as strs
+        self.assertEqual(result, matcher.find_all_starts(DNA.encode()))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'genome.2bit')
+            twobit.write_2bit([DNA], path)
+            with twobit.TwoBitGenome(path) as genome:
+                self.assertCountEqual(list(matcher.scan(chunks)),
+                                      list(matcher.scan(genome.chunks(7))))
+        self.assertRaises(ValueError, matcher.find_all_starts, b'ACNGT')
+
+    def test_pattern_matcher_rev_comp(self):
+        """Aho-Corasick matcher should match reverse complements"""
+
+        matcher = aho_corasick.PatternMatcher(['AAC', 'ACGT'], True)
+        self.assertEqual({'AAC': [0, 3], 'ACGT': [1]},
+                         matcher.find_all_starts('AACGTTTGT'))
+        self.assertRaises(ValueError, aho_corasick.PatternMatcher, [])
+        self.assertRaises(ValueError, aho_corasick.PatternMatcher, ['AC', ''])
+        self.assertRaises(ValueError, aho_corasick.PatternMatcher, ['AN'])
+        self.assertRaises(ValueError, matcher.find_all_starts, 'ACNGT')
+
     def test_freq_finder(self):
         """Frequency-finder should calculate frequencies correctly"""
 
@@ -168,6 +282,39 @@ class Tester(unittest.TestCase):
         self.assertRaises(ValueError, freq_finder.rev_comp, 'L')
         self.assertRaises(ValueError, freq_finder.rev_comp, 'ACGTR')
 
+    def test_min_skew(self):
+        """Minimum skew indexes should be found correctly"""
+
+        for DNA, mins in self.known_min_skew:
+            self.assertEqual(mins, freq_finder.min_skew(DNA))
+        self.assertRaises(ValueError, freq_finder.min_skew, '')
+        self.assertRaises(ValueError, freq_finder.min_skew, 'ACGU')
+
+    def test_skew_chunks(self):
+        """Skew should not depend on how the DNA string is chunked"""
+
+        DNA = self.known_min_skew[0][0]
+        whole = skew.skew_extremes([DNA])
+        profile = skew.skew_profile([DNA.encode()])
+        self.assertEqual(min(0, min(profile)), whole[0])
+        self.assertEqual(max(0, max(profile)), whole[2])
+        for chunk_size in (1, 5, 13, 100):
+            chunks = list(skew.chunked(DNA, chunk_size))
+            self.assertEqual(whole, skew.skew_extremes(chunks))
+            self.assertEqual(profile, skew.skew_profile(chunks))
+            self.assertEqual(profile[6::7] + [profile[-1]],
+                             skew.skew_profile(chunks, 7))
+
+    def test_gc_content(self):
+        """GC content should be found in each window"""
+
+        self.assertEqual([2 / 3, 1.0, 0.0, 0.5],
+                         skew.gc_content(['ACG', 'CGCA', 'T', 'AT', 'G'], 3))
+        self.assertEqual([0.5], skew.gc_content([b'ATGC'], 10))
+        self.assertRaises(ValueError, skew.gc_content, ['ACGT'], 0)
+        self.assertRaises(ValueError, skew.gc_content, [], 5)
+        self.assertRaises(ValueError, skew.skew_profile, ['AC'], 0)
+
     def test_approx_start_finder(self):
         """Approximate starting positions should be found correctly"""
 
@@ -175,6 +322,23 @@ class Tester(unittest.TestCase):
             result = freq_finder.find_approx_starts(DNA, pat, dist)
             self.assertEqual(starts, result)
 
+    def test_split_seeds(self):
+        """Seeds should cover the pattern in dist + 1 pieces"""
+
+        self.assertEqual([(0, 'AT'), (2, 'TCT'), (5, 'GGA')],
+                         freq_finder.split_seeds('ATTCTGGA', 2))
+        self.assertEqual([(0, 'ACGT')], freq_finder.split_seeds('ACGT', 0))
+        self.assertRaises(ValueError, freq_finder.split_seeds, 'ACG', 3)
+        self.assertRaises(ValueError, freq_finder.split_seeds, 'ACG', -1)
+        self.assertRaises(ValueError, freq_finder.split_seeds, '', 1)
+
+    def test_indexed_approx_start_finder(self):
+        """Suffix array should find approximate starts correctly"""
+
+        for DNA, pat, dist, starts in self.known_approx_starts:
+            index = suffix_array.SuffixArray(DNA)
+            self.assertEqual(starts, index.find_approx_starts(pat, dist))
+
     def test_approx_start_finder_failure(self):
         """Approximate starting position finder should error on bad input"""
 
@@ -192,6 +356,14 @@ class Tester(unittest.TestCase):
             result = freq_finder.find_most_approx_freq(DNA, pat_len, dist)
             self.assertCountEqual(freq, result)
 
+    def test_approx_freq_rev_comp_finder(self):
+        """Most-frequent approximate patterns & rev-comps should be found"""
+
+        for DNA, pat_len, dist, freq in self.known_approx_freq_rev_comp:
+            result = freq_finder.find_most_approx_freq(DNA, pat_len, dist,
+                                                       True)
+            self.assertCountEqual(freq, result)
+
     def test_approx_freq_pattern_finder_failure(self):
         """Most-frequent approximate pattern finder should error on bad input"""
 
@@ -205,6 +377,65 @@ class Tester(unittest.TestCase):
                           'EAATTAATTGGTAGGTAGGTA', 4, 1)
         self.assertRaises(ValueError, freq_finder.find_most_approx_freq,
                           'ATA', 4, 1)
-                          
+
+    def test_parallel_counts(self):
+        """Counting in several processes should match counting in one"""
+
+        DNA = 'ACGTTGCATGTCGCATGATGCATGAGAGCT' * 3
+        for pat_len in (1, 4, 7):
+            for canonical in (False, True):
+                counts = freq_finder.count_codes(DNA, pat_len, canonical)
+                for workers in (2, 3):
+                    self.assertEqual(counts, freq_finder.count_codes(
+                        DNA.encode(), pat_len, canonical, workers))
+            self.assertEqual(freq_finder.calc_freq(DNA, pat_len),
+                             freq_finder.calc_freq(DNA, pat_len, 2))
+        for DNA, pat_len, dist, freq in self.known_approx_freq_rev_comp:
+            self.assertCountEqual(freq, freq_finder.find_most_approx_freq(
+                DNA, pat_len, dist, True, 2))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'genome.2bit')
+            twobit.write_2bit([DNA], path)
+            with twobit.TwoBitGenome(path) as genome:
+                self.assertEqual(freq_finder.count_codes(DNA, 5),
+                                 freq_finder.count_codes(genome, 5, False, 2))
+        self.assertRaises(ValueError, freq_finder.count_codes, DNA, 3, False, 0)
+        self.assertRaises(ValueError, freq_finder.count_codes, 'ACGN', 2,
+                          False, 2)
+
+    def test_two_bit_genome(self):
+        """Searches over 2-bit genomes should match searches over strings"""
+
+        chunk_size = freq_finder.CHUNK_SIZE
+        # small chunks so that matches cross chunk boundaries
+        freq_finder.CHUNK_SIZE = 5
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                path = os.path.join(folder, 'genome.2bit')
+                for DNA, pat, dist, starts in self.known_approx_starts:
+                    twobit.write_2bit([DNA], path)
+                    with twobit.TwoBitGenome(path) as genome:
+                        self.assertEqual(starts, freq_finder.find_approx_starts(
+                            genome, pat, dist))
+                        self.assertEqual(freq_finder.find_starts(DNA, pat),
+                                         freq_finder.find_starts(genome, pat))
+                for DNA, pat_len, dist, freq in self.known_approx_freq:
+                    twobit.write_2bit([DNA], path)
+                    with twobit.TwoBitGenome(path) as genome:
+                        self.assertCountEqual(freq,
+                                              freq_finder.find_most_approx_freq(
+                                                  genome, pat_len, dist))
+                        self.assertEqual(freq_finder.calc_freq(DNA, pat_len),
+                                         freq_finder.calc_freq(genome,
+                                                               pat_len))
+                for DNA, pat_len, min_times, window_len, clumps in \
+                        self.known_clumps:
+                    twobit.write_2bit([DNA], path)
+                    with twobit.TwoBitGenome(path) as genome:
+                        self.assertEqual(clumps, freq_finder.find_clumps(
+                            genome, pat_len, min_times, window_len))
+        finally:
+            freq_finder.CHUNK_SIZE = chunk_size
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,237 @@
+import json
+import os
+import random
+import sys
+from time import perf_counter
+import tracemalloc
+
+import motifs
+
+# the bundled dataset, & where results go by default, next to this file
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'data.txt')
+OUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'benchmark.json')
+# synthetic datasets of increasing size:
+# (number of strings, string length, motif length, planted substitutions)
+PLANTED_SIZES = ((10, 100, 8, 1), (20, 300, 12, 2), (30, 400, 15, 4))
+# exhaustive finders are only run where their worst-case work, in
+# windows checked against candidate motifs, is at most these
+MAX_MEDIAN_WORK = 1 << 30
+MAX_BRUTE_WORK = 1 << 24
+# restarts for the randomized finders, fewer than their defaults so a
+# full run stays in minutes
+RANDOM_RESTARTS = 100
+SAMPLER_RESTARTS = 5
+# the seed for every dataset & randomized finder
+SEED = 0
+
+def read_data(path: str) -> (list, int):
+    """Reads a motif dataset: 'pat_len num_DNAs ...' then one string per line
+
+    :param path: the file to read
+    :type path: str
+    :returns: the DNA strings, & the motif length to search for
+    :rtype: tuple (list (of strs), int)
+    """
+
+    with open(path) as data:
+        pat_len = int(data.readline().split()[0])
+        DNAs = [line.rstrip() for line in data if line.strip()]
+    return DNAs, pat_len
+
+def plant_motifs(num_DNAs: int, DNA_len: int, pat_len: int, dist: int,
+                 rng) -> (list, str):
+    """Makes random DNA strings, each hiding a copy of one random motif
+
+    Each copy has exactly dist substitutions, at random positions
+
+    :param num_DNAs: the number of strings to make
+    :type num_DNAs: int
+    :param DNA_len: the length of each string
+    :type DNA_len: int
+    :param pat_len: the length of the motif
+    :type pat_len: int
+    :param dist: the substitutions in each copy of the motif
+    :type dist: int
+    :param rng: where to draw random numbers from
+    :type rng: random.Random
+    :returns: the DNA strings, & the motif hidden in them
+    :rtype: tuple (list (of strs), str)
+    """
+
+    if pat_len > DNA_len:
+        raise ValueError('Motif cannot be longer than the strings')
+    if not 0 <= dist <= pat_len:
+        raise ValueError('Substitutions must be between 0 & motif length')
+    motif = ''.join(rng.choices(motifs.BASES, k=pat_len))
+    DNAs = []
+    for _ in range(num_DNAs):
+        copy = list(motif)
+        for i in rng.sample(range(pat_len), dist):
+            copy[i] = rng.choice([base for base in motifs.BASES
+                                  if base != motif[i]])
+        DNA = rng.choices(motifs.BASES, k=DNA_len)
+        start = rng.randrange(DNA_len - pat_len + 1)
+        DNA[start:start + pat_len] = copy
+        DNAs.append(''.join(DNA))
+    return DNAs, motif
+
+def median_dist(DNAs: list, pat: str) -> int:
+    """Totals the distance from a string to the nearest window of each DNA
+
+    :param DNAs: DNA strings
+    :type DNAs: list (of strs)
+    :param pat: the string to measure from
+    :type pat: str
+    :returns: the sum of each string's smallest window distance
+    :rtype: int
+    """
+
+    pat_len = len(pat)
+    return sum(min(motifs.ham_dist(pat, DNA[i:i + pat_len])
+                   for i in range(len(DNA) - pat_len + 1)) for DNA in DNAs)
+
+def finder_runs(DNAs: list, pat_len: int, dist: int) -> list:
+    """Lists the finders to benchmark on one dataset
+
+    :param DNAs: the dataset's DNA strings
+    :type DNAs: list (of strs)
+    :param pat_len: the motif length to search for
+    :type pat_len: int
+    :param dist: the substitutions allowed to brute_finder, or None to
+                 leave brute_finder out
+    :type dist: int or None
+    :returns: each finder's name, a function running it, & a function
+              scoring its result
+    :rtype: list (of tuples (str, function, function))
+    """
+
+    num_windows = sum(len(DNA) - pat_len + 1 for DNA in DNAs)
+
+    runs = [('greedy_finder', lambda: motifs.greedy_finder(DNAs, pat_len),
+             motifs.score_motifs),
+            ('random_finder',
+             lambda: motifs.random_finder(DNAs, pat_len, RANDOM_RESTARTS,
+                                          seed=SEED),
+             motifs.score_motifs),
+            ('sampler_finder',
+             lambda: motifs.sampler_finder(DNAs, pat_len,
+                                           restarts=SAMPLER_RESTARTS,
+                                           seed=SEED),
+             motifs.score_motifs),
+            ('em_finder', lambda: motifs.em_finder(DNAs, pat_len),
+             motifs.score_motifs)]
+    # every string of pat_len, against every window
+    if 4 ** pat_len * num_windows <= MAX_MEDIAN_WORK:
+        runs.append(('median_string',
+                     lambda: motifs.median_string(DNAs, pat_len),
+                     lambda median: median_dist(DNAs, median)))
+    # every neighbor of every window
+    if (dist is not None and
+        len(motifs.sub_masks(pat_len, dist)) * num_windows <= MAX_BRUTE_WORK):
+        # brute_finder has no score; count the motifs found
+        runs.append(('brute_finder',
+                     lambda: motifs.brute_finder(DNAs, pat_len, dist), len))
+    return runs
+
+def measure(run, trace_memory: bool = False) -> (float, int, object):
+    """Runs a function for wall time, & optionally again for peak memory
+
+    Memory is traced on a separate run, since tracing slows the run many
+    times over
+
+    :param run: the function to run, taking no arguments
+    :type run: function
+    :param trace_memory: whether to also measure peak memory (default
+                         False)
+    :type trace_memory: bool
+    :returns: seconds taken, peak bytes allocated while running (None if
+              not traced), & the result of the timed run
+    :rtype: tuple (float, int or None, any)
+    """
+
+    start = perf_counter()
+    result = run()
+    seconds = perf_counter() - start
+    if not trace_memory:
+        return seconds, None, result
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, result
+
+def datasets(sizes=PLANTED_SIZES) -> list:
+    """Gathers the bundled dataset & synthetic ones
+
+    :param sizes: the synthetic datasets to make (default PLANTED_SIZES)
+    :type sizes: tuple (of tuples (int, int, int, int))
+    :returns: each dataset's name, strings, motif length & substitutions
+              (None where unknown)
+    :rtype: list (of tuples (str, list (of strs), int, int or None))
+    """
+
+    all_data = []
+    if os.path.exists(DATA_PATH):
+        DNAs, pat_len = read_data(DATA_PATH)
+        # how far its motifs were planted is unknown, so brute_finder
+        # has no meaningful distance to search within
+        all_data.append(('data.txt', DNAs, pat_len, None))
+    rng = random.Random(SEED)
+    for num_DNAs, DNA_len, pat_len, dist in sizes:
+        DNAs, _ = plant_motifs(num_DNAs, DNA_len, pat_len, dist, rng)
+        name = 'planted-{}x{}-k{}-d{}'.format(num_DNAs, DNA_len, pat_len,
+                                             dist)
+        all_data.append((name, DNAs, pat_len, dist))
+    return all_data
+
+def run_benchmarks(all_data: list, out_path: str = None,
+                   trace_memory: bool = False) -> list:
+    """Benchmarks every finder on every dataset
+
+    Records are written out as soon as each is measured, so a long run
+    cut short keeps what it has done
+
+    :param all_data: the datasets to use (see datasets)
+    :type all_data: list (of tuples (str, list (of strs), int, int or None))
+    :param out_path: the JSON file to write records to, or None to not
+                     write them (default None)
+    :type out_path: str
+    :param trace_memory: whether to also measure each finder's peak
+                         memory, which takes far longer (default False)
+    :type trace_memory: bool
+    :returns: one record per finder per dataset
+    :rtype: list (of dicts)
+    """
+
+    records = []
+    for name, DNAs, pat_len, dist in all_data:
+        for finder, run, score in finder_runs(DNAs, pat_len, dist):
+            seconds, peak, result = measure(run, trace_memory)
+            record = {'dataset': name, 'finder': finder,
+                      'num_DNAs': len(DNAs), 'DNA_len': max(map(len, DNAs)),
+                      'pat_len': pat_len, 'seconds': seconds,
+                      'peak_bytes': peak, 'score': score(result)}
+            records.append(record)
+            if out_path is not None:
+                with open(out_path, mode='w') as output:
+                    json.dump(records, output, indent=2)
+    return records
+
+if __name__ == '__main__':
+    # usage: benchmark.py [--memory] [output file]
+    args = sys.argv[1:]
+    trace_memory = '--memory' in args
+    if trace_memory:
+        args.remove('--memory')
+    if len(args) <= 1:
+        records = run_benchmarks(datasets(), args[0] if args else OUT_PATH,
+                                 trace_memory)
+        for record in records:
+            memory = ('' if record['peak_bytes'] is None
+                      else ' {:>11}B'.format(record['peak_bytes']))
+            print('{dataset:24} {finder:15} {seconds:9.3f}s{} '
+                  'score {score}'.format(memory, **record))
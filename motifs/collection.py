@@ -0,0 +1,63 @@
+import os
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from seq_utils import encode
+
+class DNACollection:
+    """A fixed group of DNA strings, checked & encoded only once
+
+    Behaves like a list of the strings, so it can be passed to any
+    motif finder in their place; finders then skip checking & encoding
+    them again, which matters when the same strings are searched many
+    times (e.g. different motif lengths, or repeated random runs)
+
+    read-only attributes: nums
+    """
+
+    def __init__(self, DNAs):
+        """Check & encode some DNA strings
+
+        :param DNAs: the DNA strings to hold, e.g. the sequences of
+                     records from read_records
+        :type DNAs: iterable (of strs or bytes-likes)
+        """
+
+        strs = []
+        nums = []
+        for DNA in DNAs:
+            if not isinstance(DNA, str):
+                DNA = bytes(DNA).decode('latin-1')
+            if not DNA:
+                raise ValueError('Cannot use empty string as a motif location')
+            # encoding fails on any non-DNA base
+            nums.append(encode(DNA))
+            strs.append(DNA)
+        self._DNAs = tuple(strs)
+        self._nums = tuple(nums)
+
+    @property
+    def nums(self) -> tuple:
+        """Each string encoded to one 2-bit number per byte (see encode)"""
+        return self._nums
+
+    def __len__(self) -> int:
+        return len(self._DNAs)
+
+    def __getitem__(self, index):
+        """Get a string, or a list of strings for a slice
+
+        :param index: the index or slice to get
+        :type index: int or slice
+        :returns: the DNA string(s)
+        :rtype: str or list (of strs)
+        """
+
+        if isinstance(index, slice):
+            return list(self._DNAs[index])
+        return self._DNAs[index]
+
+    def __iter__(self):
+        return iter(self._DNAs)
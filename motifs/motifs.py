@@ -1,6 +1,39 @@
-from random import choice, choices
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from heapq import nlargest
+from itertools import accumulate, chain, compress, product, repeat
+from math import exp, log as ln
+from operator import add, itemgetter, mul
+import os
+import random
+import sys
+
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from collection import DNACollection
+from fasta import read_records
+from seq_utils import (check_DNA, code_dists, code_to_pat, encode,
+                       encoded_kmer_codes, get_rng, iter_neighbors, sub_masks)
 
 BASES = ('A', 'C', 'G', 'T')
+# translate encoded bases to 1 where they differ from each base, else 0
+_MISMATCH_TABLES = [bytes.maketrans(b'\x00\x01\x02\x03',
+                                    bytes(int(num != base) for num in range(4)))
+                    for base in range(4)]
+# and to 1 where they match each base, else 0
+_MATCH_TABLES = [bytes.maketrans(b'\x00\x01\x02\x03',
+                                 bytes(int(num == base) for num in range(4)))
+                 for base in range(4)]
+# the probability a starting EM profile gives its own base in each column
+EM_START_PROB = 0.5
+# the rounds of EM each starting profile gets before the best is chosen
+EM_TRIAL_ROUNDS = 3
+# the most windows greedy_finder scores at once, across all seeds
+GREEDY_BATCH_WINDOWS = 1 << 16
+# the number of columns greedy_finder looks up together
+GREEDY_GROUP_LEN = 3
 
 def ham_dist(one: str, two: str) -> int:
     """Calculates HAMming DISTance between two strings
@@ -43,40 +76,7 @@ def get_neighbors(pat: str, dist: int) -> list:
         raise ValueError('Cannot find neighbors of empty string')
     if dist < 0:
         raise ValueError('Cannot have a negative distance')
-    # dist of 0 means no changes
-    if dist == 0:
-        return [pat]
-    if len(pat) == 1:
-        return list(BASES)
-    # lists of strings currently 0, 1, 2, .... d differences from pat
-    neighbors = [[] for _ in range(dist + 1)]
-    # build off empty string
-    neighbors[0] = ['']
-    # add on new chars to each existing string one at a time
-    for i in range(len(pat)):
-        old = list(neighbors)
-        neighbors = [[] for _ in range(dist + 1)]
-        correct = pat[i]
-        try:
-            BASES.index(correct)
-        except ValueError:
-            raise ValueError('Non-DNA base "' + correct + '" in given string')
-        # loop over all dist-lists
-        for cur_dist in range(dist + 1):
-            for cur_pat in old[cur_dist]:
-                # using the correct char does not move back a list
-                neighbors[cur_dist].append(cur_pat + correct)
-                if cur_dist < dist:
-                    for base in BASES:
-                        if base != correct:
-                            # using incorrect char does move back a list
-                            neighbors[cur_dist + 1].append(cur_pat + base)
-    # group together in one list
-    all_neighbors = []
-    for group in neighbors:
-        for neighbor in group:
-            all_neighbors.append(neighbor)
-    return all_neighbors
+    return list(iter_neighbors(pat, dist))
 
 def ensure_validity(DNAs: list, pat_len: int):
     """For all motif finder methods, checks params for validity
@@ -84,7 +84,7 @@ def ensure_validity(DNAs: list, pat_len: int):
     Raises appropriate errors if params are invalid
     
     :param DNAs: DNA strings with a shared motif
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
     """
@@ -93,25 +93,55 @@ def ensure_validity(DNAs: list, pat_len: int):
         raise ValueError('Cannot find motifs between non-existant strings')
     if len(DNAs) < 2:
         raise ValueError('Must compare at lest 2 strings to find motifs')
-    for DNA in DNAs:
-        if not DNA:
-            raise ValueError('Cannot use empty string as a motif location')
-        for base in DNA:
-            try:
-                BASES.index(base)
-            except:
-                raise ValueError('Non-DNA base "' + base + '" in given string')
+    # collections were checked when they were made
+    if not isinstance(DNAs, DNACollection):
+        for DNA in DNAs:
+            if not DNA:
+                raise ValueError('Cannot use empty string as a motif location')
+            check_DNA(DNA)
     if pat_len < 1:
         raise ValueError('Motifs must be at least 1 base long')
 
+def neighborhood(nums: bytes, pat_len: int, dist: int) -> set:
+    """Finds the numbers of every string near some window of a DNA string
+
+    Each distinct window is expanded only once, however often it repeats
+
+    :param nums: the DNA string to search in, already encoded (see encode)
+    :type nums: bytes
+    :param pat_len: the length of windows & neighbors
+    :type pat_len: int
+    :param dist: the maximum substitutions from a window
+    :type dist: int
+    :returns: the numbers of all neighbors of all windows of DNA
+    :rtype: set (of ints)
+    """
+
+    masks = sub_masks(pat_len, dist)
+    return {code ^ mask for code in set(encoded_kmer_codes(nums, pat_len))
+            for mask in masks}
+
+def encode_all(DNAs: list) -> list:
+    """Encodes DNA strings, unless they already are (see DNACollection)
+
+    :param DNAs: DNA strings
+    :type DNAs: list (of strs) or DNACollection
+    :returns: each string encoded (see encode)
+    :rtype: list (of bytes)
+    """
+
+    if isinstance(DNAs, DNACollection):
+        return DNAs.nums
+    return [encode(DNA) for DNA in DNAs]
+
 def brute_finder(DNAs: list, pat_len: int, dist: int) -> set:
     """Brute-forces all possible motifs
 
-    Trys every neighbor of every substring of length pat_len in the
-    first DNA string
+    Finds every neighbor of every window of each DNA string at once,
+    keeping only those found in all of them
     
     :param DNAs: DNA strings with a shared motif
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
     :param dist: the maximum substitutions for each instance of the motif
@@ -121,56 +151,143 @@ def brute_finder(DNAs: list, pat_len: int, dist: int) -> set:
     """
 
     ensure_validity(DNAs, pat_len)
-    motifs = set()
-    end_indexes = [(len(DNA) - pat_len + 1) for DNA in DNAs]
-    for i in range(end_indexes[0]):
-        cur_pat = DNAs[0][i:i + pat_len]
-        if not cur_pat in motifs:
-            for neighbor in get_neighbors(cur_pat, dist):
-                if not neighbor in motifs:
-                    found_all = True
-                    for j in range(1, len(DNAs)):
-                        found = False
-                        for k in range(end_indexes[j]):
-                            compare_pat = DNAs[j][k:k + pat_len]
-                            if ham_dist(neighbor, compare_pat) <= dist:
-                                found = True
-                                break
-                        if not found:
-                            found_all = False
-                            break
-                    if found_all:
-                        motifs.add(neighbor)
-    return motifs
-
-def all_DNA_strings(pat_len: int) -> list:
-    """Produce all DNA strings of a certain length
+    if dist < 0:
+        raise ValueError('Cannot have a negative distance')
+    all_nums = encode_all(DNAs)
+    motifs = neighborhood(all_nums[0], pat_len, dist)
+    for nums in all_nums[1:]:
+        if not motifs:
+            break
+        motifs &= neighborhood(nums, pat_len, dist)
+    return {code_to_pat(code, pat_len) for code in motifs}
+
+def all_DNA_strings(pat_len: int):
+    """Produce all DNA strings of a certain length, in alphabetical order
+
+    Strings are made one at a time, so only the current one is held
 
     :param pat_len: the length of all strings to produce
     :type pat_len: int
     :returns: the DNA strings of length pat_len
-    :rtype: list (of strs)
+    :rtype: iterator (of strs)
     """
     
     if pat_len < 0:
         raise ValueError('Cannot find negative-length strings')
-    if pat_len == 0:
-        return ['']
-    all_DNA = []
-    # recursion; adding on all bases to each string of length less than
-    for short in all_DNA_strings(pat_len - 1):
-        for base in BASES:
-            all_DNA.append(short + base)
-    return all_DNA
+    return map(''.join, product(BASES, repeat=pat_len))
+
+def all_DNA_codes(pat_len: int) -> range:
+    """Produce the numbers of all DNA strings of a certain length
+
+    Numbers come in the same order as all_DNA_strings (see code_to_pat)
+
+    :param pat_len: the length of all strings to produce numbers for
+    :type pat_len: int
+    :returns: the numbers of the DNA strings of length pat_len
+    :rtype: range
+    """
+
+    if pat_len < 0:
+        raise ValueError('Cannot find negative-length strings')
+    return range(4 ** pat_len)
+
+def _median_search(code: int, depth: int, partials: list, mismatches: list,
+                   pat_len: int, extra: int, best: tuple) -> tuple:
+    """Searches every string starting with a prefix for a better median
+
+    Each base is added to the prefix in alphabetical order; a longer
+    prefix can only be further from each window, so any prefix whose
+    distance already reaches the best total is skipped whole
+
+    :param code: the number of the prefix so far
+    :type code: int
+    :param depth: the length of the prefix so far
+    :type depth: int
+    :param partials: for each DNA string, a list where [i] is the
+                     distance between the prefix & the window at i
+    :type partials: list (of lists (of ints))
+    :param mismatches: for each DNA string, 4 byte strings (one per
+                       base) with 1 wherever it differs from that base
+    :type mismatches: list (of lists (of bytes))
+    :param pat_len: the length of median strings to search for
+    :type pat_len: int
+    :param extra: distance added for strings with no windows at all
+    :type extra: int
+    :param best: the lowest total distance so far, & its number
+    :type best: tuple (int, int)
+    :returns: the lowest total distance after searching, & its number
+    :rtype: tuple (int, int)
+    """
+
+    for base in range(4):
+        # extend every window's distance by the base at this depth
+        cur_partials = [list(map(add, partial,
+                                 diffs[base][depth:depth + len(partial)]))
+                        for partial, diffs in zip(partials, mismatches)]
+        cur_dist = extra + sum(map(min, cur_partials))
+        # later strings only win by being strictly better
+        if cur_dist >= best[0]:
+            continue
+        cur_code = (code << 2) | base
+        if depth + 1 == pat_len:
+            best = (cur_dist, cur_code)
+        else:
+            best = _median_search(cur_code, depth + 1, cur_partials,
+                                  mismatches, pat_len, extra, best)
+    return best
+
+def _median_bound(all_nums: list, pat_len: int) -> tuple:
+    """Finds a good (but not necessarily best) median to bound the search
+
+    Every window of the first DNA string is tried, then the best one is
+    replaced by the consensus of its nearest windows while that improves
+
+    :param all_nums: the DNA strings, encoded (see encode), all at least
+                     pat_len long
+    :type all_nums: list (of bytes)
+    :param pat_len: the length of median strings to search for
+    :type pat_len: int
+    :returns: the total distance of the median found, & its number
+    :rtype: tuple (int, int)
+    """
+
+    all_codes = [encoded_kmer_codes(nums, pat_len) for nums in all_nums]
+    def total(code: int) -> int:
+        return sum(min(code_dists(codes, code, pat_len))
+                   for codes in all_codes)
+    best = min((total(code), code) for code in set(all_codes[0]))
+    while True:
+        counts = [[0] * 4 for _ in range(pat_len)]
+        for codes in all_codes:
+            dists = code_dists(codes, best[1], pat_len)
+            nearest = codes[dists.index(min(dists))]
+            for i in range(pat_len):
+                counts[i][(nearest >> 2 * (pat_len - 1 - i)) & 3] += 1
+        code = 0
+        for count in counts:
+            code = (code << 2) | count.index(max(count))
+        dist = total(code)
+        if dist >= best[0]:
+            return best
+        best = (dist, code)
 
 def median_string(DNAs: list, pat_len: int) -> str:
     """Finds an optimal median string between all DNA strings
 
     A 'median string' is of length pat_len and appears in all DNA strings
-    passed in with a minimal number of substitutions
+    passed in with a minimal number of substitutions. Strings are tried
+    in alphabetical order as a tree of prefixes, so the first best one
+    is found without trying them all; a quick guess at a median bounds
+    the search from the start
+
+    The search still grows about 4-fold with each base of pat_len, and
+    is only as fast as the guess is good: for 20 strings of length 300,
+    it takes under half a minute up to pat_len 10 & under a minute at
+    12 when a motif that long is planted, but far longer otherwise, so
+    pat_len much past 12 is not practical
 
     :param DNAs: DNA strings
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of median strings to search for
     :type pat_len: int
     :returns: the best median string
@@ -178,31 +295,32 @@ def median_string(DNAs: list, pat_len: int) -> str:
     """
     
     ensure_validity(DNAs, pat_len)
-    min_dist = len(DNAs) * pat_len + 1
-    best_str = ''
-    for cur_str in all_DNA_strings(pat_len):
-        # distance for cur_str
-        cur_dist = 0
-        for DNA in DNAs:
-            # distance for this DNA string
-            this_dist = pat_len + 1
-            for i in range(len(DNA) - pat_len + 1):
-                # distance for this substring
-                dist = ham_dist(cur_str, DNA[i:i + pat_len])
-                if dist < this_dist:
-                    this_dist = dist
-            cur_dist += this_dist
-        if cur_dist < min_dist:
-            best_str, min_dist = cur_str, cur_dist
-    return best_str
-
-def calc_prob(pat: str, profile: list) -> float:
+    all_nums = [nums for nums in encode_all(DNAs) if len(nums) >= pat_len]
+    # strings too short for any window count as further than any window
+    extra = (len(DNAs) - len(all_nums)) * (pat_len + 1)
+    mismatches = [[nums.translate(table) for table in _MISMATCH_TABLES]
+                  for nums in all_nums]
+    partials = [[0] * (len(nums) - pat_len + 1) for nums in all_nums]
+    best = (len(DNAs) * pat_len + 1, 0)
+    if all_nums:
+        # anything as good as the guess is searched, so the first best
+        # (not the guess) is still found
+        dist, code = _median_bound(all_nums, pat_len)
+        best = (extra + dist + 1, code)
+    _, best_code = _median_search(0, 0, partials, mismatches, pat_len, extra,
+                                  best)
+    return code_to_pat(best_code, pat_len)
+
+def calc_prob(pat: str, profile: list, log: bool = False) -> float:
     """Calculates probability of a string given a profile
 
     :param pat: the string to find probability of
     :type pat: str
     :param profile: a probability profile (4 rows)
     :type profile: list (of lists (of floats))
+    :param log: whether profile holds log-probabilities, giving a
+                log-probability back (default False)
+    :type log: bool
     :returns: the probability of pat given profile
     :rtype: float
     """
@@ -220,21 +338,122 @@ def calc_prob(pat: str, profile: list) -> float:
         raise ValueError('All rows of profile must be same length')
     if pat_len != len(pat):
         raise ValueError('Profile is the wrong length for this pattern')
-    prob = 1
+    prob = 0. if log else 1
     for i in range(pat_len):
         try:
-            prob *= profile[BASES.index(pat[i])][i]
+            if log:
+                prob += profile[BASES.index(pat[i])][i]
+            else:
+                prob *= profile[BASES.index(pat[i])][i]
         except:
             raise ValueError('Non-DNA base "' + pat[i] + '" found')
     return prob
 
-def best_by_profile(DNA: str, profile: list) -> str:
+def profile_scores(nums: bytes, profile: list, log: bool = False) -> list:
+    """Calculates the probability of every window of a string given a profile
+
+    Probabilities are built up one profile column at a time across all
+    windows at once, in the same order as calc_prob, so results are
+    exactly equal to calling it on each window
+
+    :param nums: the string to score, already encoded (see encode)
+    :type nums: bytes
+    :param profile: a probability profile, 4 rows & pat_len columns
+    :type profile: list (of lists (of floats))
+    :param log: whether profile holds log-probabilities, giving
+                log-probabilities back (default False)
+    :type log: bool
+    :returns: a list where [i] is the probability of the window at i
+    :rtype: list (of floats)
+    """
+
+    pat_len = len(profile[0])
+    num_windows = len(nums) - pat_len + 1
+    # log-probabilities are summed instead of multiplied
+    combine = add if log else mul
+    probs = [0. if log else 1] * num_windows
+    for i in range(pat_len):
+        # this column's probabilities, looked up by each window's base
+        col = [row[i] for row in profile]
+        probs = list(map(combine, probs,
+                         map(col.__getitem__, nums[i:i + num_windows])))
+    return probs
+
+def log_sum_exp(log_probs: list) -> float:
+    """Finds the log of the sum of some log-probabilities' probabilities
+
+    Uses the log-sum-exp trick, shifting by the largest first, so even
+    tiny probabilities do not underflow to all zeros
+
+    :param log_probs: the log-probabilities to add up
+    :type log_probs: list (of floats)
+    :returns: log(sum(exp(log_prob) for log_prob in log_probs))
+    :rtype: float
+    """
+
+    top = max(log_probs)
+    return top + ln(sum(exp(log_prob - top) for log_prob in log_probs))
+
+def log_weights(log_probs: list) -> list:
+    """Converts log-probabilities to probabilities which sum to 1
+
+    :param log_probs: the log-probabilities to convert
+    :type log_probs: list (of floats)
+    :returns: a list where [i] is proportional to exp(log_probs[i])
+    :rtype: list (of floats)
+    """
+
+    total = log_sum_exp(log_probs)
+    return [exp(log_prob - total) for log_prob in log_probs]
+
+def weighted_choice(weights: list, rng=None) -> int:
+    """Randomly picks an index, with chances proportional to weights
+
+    Draws exactly the same numbers, & picks exactly the same index, as
+    rng.choices(range(len(weights)), weights)[0], without building a
+    population or a list of picks
+
+    :param weights: how likely each index is to be picked
+    :type weights: list (of floats)
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
+    :returns: the index picked
+    :rtype: int
+    """
+
+    rng = get_rng(rng)
+    cum_weights = list(accumulate(weights))
+    total = cum_weights[-1] + 0.
+    if not total > 0.:
+        raise ValueError('Total of weights must be greater than zero')
+    return bisect(cum_weights, rng.random() * total, 0, len(cum_weights) - 1)
+
+def best_start(nums: bytes, profile: list, log: bool = False) -> int:
+    """Finds where the most probable substring given a profile starts
+
+    :param nums: the string to search in, already encoded (see encode)
+    :type nums: bytes
+    :param profile: a probability profile, 4 rows & pat_len columns
+    :type profile: list (of lists (of floats))
+    :param log: whether profile holds log-probabilities (default False)
+    :type log: bool
+    :returns: the first start of a most probable substring
+    :rtype: int
+    """
+
+    probs = profile_scores(nums, profile, log)
+    return max(range(len(probs)), key=probs.__getitem__)
+
+def best_by_profile(DNA: str, profile: list, log: bool = False) -> str:
     """Finds most probable substring given a profile
 
     :param DNA: the string to search in
     :type DNA: str
     :param profile: a probability profile, 4 rows & pat_len columns
     :type profile: list (of lists (of floats))
+    :param log: whether profile holds log-probabilities (default False)
+    :type log: bool
     :returns: the most probable substring of DNA
     :rtype: str
     """
@@ -251,21 +470,33 @@ def best_by_profile(DNA: str, profile: list) -> str:
         raise ValueError('All rows of profile must be same length')
     if pat_len > len(DNA):
         raise ValueError('DNA string is not long enough for this profile')
-    best_prob = -1.
-    best_str = ''
-    # try all possible subbstrings
-    for i in range(len(DNA) - pat_len + 1):
-        cur_str = DNA[i:i + pat_len]
-        cur_prob = calc_prob(cur_str, profile)
-        if cur_prob > best_prob:
-            best_prob, best_str = cur_prob, cur_str
-    return best_str
-
-def get_profile(motifs: list) -> list:
+    if not pat_len:
+        raise ValueError('Cannot calculate probability of empty string')
+    start = best_start(encode(DNA), profile, log)
+    return DNA[start:start + pat_len]
+
+@lru_cache(maxsize=None)
+def _log_count(count: int) -> float:
+    """Finds the (natural) log of a count, remembering it for next time
+
+    :param count: the count to find the log of
+    :type count: int
+    :returns: log(count)
+    :rtype: float
+    """
+
+    return ln(count)
+
+def get_profile(motifs: list, log: bool = False) -> list:
     """Calculate a profile (with pseudocounts!) for some motifs
 
+    In log mode every entry is log(count) - log(total), with the logs
+    of counts cached, since only small whole counts ever appear
+
     :param motifs: DNA strings to build a profile off of
     :type motfis: list (of strs)
+    :param log: whether to give log-probabilities (default False)
+    :type log: bool
     :returns: a completed probability profile
     :rtype: list (of lists (of floats))
     """
@@ -279,6 +510,10 @@ def get_profile(motifs: list) -> list:
             except ValueError:
                 raise ValueError('Non-DNA base "' + pat[i] + '" found')
     num_motifs = len(motifs) + 4
+    if log:
+        log_total = _log_count(num_motifs)
+        return [[_log_count(val) - log_total for val in row]
+                for row in profile]
     # normalize column probabilities
     return [[(val / num_motifs) for val in row] for row in profile]
 
@@ -325,13 +560,230 @@ def score_motifs(motifs: list, profile=None) -> int:
         score += ham_dist(motif, consensus)
     return score
 
+class MotifCounts:
+    """How many times each base appears in each column of some motifs
+
+    Motifs can be added & removed one at a time in O(pat_len), with
+    the score kept up to date as they are
+
+    add: count one more motif
+    remove: stop counting a motif
+    profile: calculate a profile (with pseudocounts) from the counts
+
+    read-only attributes: num_motifs, score
+    """
+
+    def __init__(self, motifs: list, pat_len: int):
+        """Count the bases of some motifs
+
+        :param motifs: the motifs to count, already encoded (see encode)
+        :type motifs: list (of bytes)
+        :param pat_len: the length of each motif
+        :type pat_len: int
+        """
+
+        if pat_len < 1:
+            raise ValueError('Motifs must be at least 1 base long')
+        self._pat_len = pat_len
+        # one row per base, like a profile
+        self._counts = [[0] * pat_len for _ in range(4)]
+        # the highest count in each column, & their sum
+        self._top = [0] * pat_len
+        self._top_sum = 0
+        self._num_motifs = 0
+        for motif in motifs:
+            self.add(motif)
+
+    @property
+    def num_motifs(self) -> int:
+        return self._num_motifs
+
+    @property
+    def score(self) -> int:
+        """Total differences between the motifs & their consensus string
+
+        Equal to score_motifs on the counted motifs: in each column,
+        every motif not matching the most common base adds 1
+        """
+
+        return self._num_motifs * self._pat_len - self._top_sum
+
+    def add(self, motif: bytes):
+        """Count one more motif
+
+        :param motif: the motif to count, already encoded (see encode)
+        :type motif: bytes
+        """
+
+        if len(motif) != self._pat_len:
+            raise ValueError('Motif is the wrong length for these counts')
+        for i, num in enumerate(motif):
+            row = self._counts[num]
+            row[i] += 1
+            if row[i] > self._top[i]:
+                self._top[i] = row[i]
+                self._top_sum += 1
+        self._num_motifs += 1
+
+    def remove(self, motif: bytes):
+        """Stop counting a motif which was added before
+
+        :param motif: the motif to remove, already encoded (see encode)
+        :type motif: bytes
+        """
+
+        if len(motif) != self._pat_len:
+            raise ValueError('Motif is the wrong length for these counts')
+        if not all(self._counts[num][i] for i, num in enumerate(motif)):
+            raise ValueError('Cannot remove a motif which was not added')
+        for i, num in enumerate(motif):
+            row = self._counts[num]
+            row[i] -= 1
+            # the top count can only drop if this base held it
+            if row[i] + 1 == self._top[i]:
+                top = max(counts[i] for counts in self._counts)
+                self._top_sum -= self._top[i] - top
+                self._top[i] = top
+        self._num_motifs -= 1
+
+    def profile(self, log: bool = False) -> list:
+        """Calculate a profile (with pseudocounts!) from the counts
+
+        Gives exactly what get_profile would for the counted motifs
+
+        :param log: whether to give log-probabilities (default False)
+        :type log: bool
+        :returns: a completed probability profile
+        :rtype: list (of lists (of floats))
+        """
+
+        total = self._num_motifs + 4
+        if log:
+            log_total = _log_count(total)
+            return [[_log_count(count + 1) - log_total for count in row]
+                    for row in self._counts]
+        return [[(count + 1) / total for count in row]
+                for row in self._counts]
+
+def _group_indexes(nums: bytes, width: int, num_seeds: int,
+                   pat_len: int) -> list:
+    """Finds where every seed looks up each group of bases of a string
+
+    :param nums: the string to scan, already encoded (see encode)
+    :type nums: bytes
+    :param width: the number of bases in each group
+    :type width: int
+    :param num_seeds: the number of seeds scanning the string
+    :type num_seeds: int
+    :param pat_len: the length of motifs being searched for
+    :type pat_len: int
+    :returns: a list where [seed * len(nums) + i] is the index into a
+              group table (see _group_table) of that seed's entry for
+              the bases starting at i, plus pat_len of padding
+    :rtype: list (of ints)
+    """
+
+    DNA_len = len(nums)
+    num_groups = DNA_len - width + 1
+    codes = list(nums[:num_groups])
+    for i in range(1, width):
+        codes = list(map(add, map(mul, codes, repeat(4)),
+                         nums[i:i + num_groups]))
+    # groups running off the end of the string are never used
+    codes += [0] * (width - 1)
+    stride = 4 ** width
+    offsets = chain.from_iterable(map(repeat, range(0, stride * num_seeds,
+                                                    stride),
+                                      repeat(DNA_len)))
+    return list(map(add, offsets, codes * num_seeds)) + [0] * pat_len
+
+def _group_table(cols: list, num_seeds: int) -> list:
+    """Multiplies out every seed's counts for each group of bases
+
+    :param cols: consecutive columns of greedy counts (see _greedy_batch)
+    :type cols: list (of lists (of ints))
+    :param num_seeds: the number of seeds counted
+    :type num_seeds: int
+    :returns: a list where [seed * 4 ** len(cols) + code] is the product
+              of that seed's counts for the bases numbered code (see
+              pat_to_code)
+    :rtype: list (of ints)
+    """
+
+    stride = 4 ** len(cols)
+    table = [0] * (stride * num_seeds)
+    for code, bases in enumerate(product(range(4), repeat=len(cols))):
+        products = cols[0][bases[0]::4]
+        for col, base in zip(cols[1:], bases[1:]):
+            products = list(map(mul, products, col[base::4]))
+        table[code::stride] = products
+    return table
+
+def _greedy_batch(all_nums: list, firsts: list, pat_len: int) -> tuple:
+    """Runs the greedy search from many seeds at once
+
+    Every seed's counts sit side by side in one list per column, & each
+    string is scanned a group of columns at a time across every seed's
+    windows together. Windows are compared by the exact product of
+    their counts (with pseudocounts), & exact ties go to the first
+    window. Profile probabilities are rounded floats, so best_by_profile
+    can break such a tie differently & pick another window
+
+    :param all_nums: each DNA string, encoded (see encode)
+    :type all_nums: list (of bytes)
+    :param firsts: each seed's motif in the first string, encoded
+    :type firsts: list (of bytes)
+    :param pat_len: the length of motifs to search for
+    :type pat_len: int
+    :returns: for each seed, the starts of its motifs in every string
+              after the first, & for each seed, its score
+    :rtype: tuple (list (of lists (of ints)), list (of ints))
+    """
+
+    num_seeds = len(firsts)
+    # [i][4 * seed + base] is that seed's count (with pseudocount) of
+    # base in column i: a seed x base x column count array
+    counts = [[1] * (4 * num_seeds) for _ in range(pat_len)]
+    for seed, motif in enumerate(firsts):
+        for i, num in enumerate(motif):
+            counts[i][4 * seed + num] += 1
+    groups = [(low, min(GREEDY_GROUP_LEN, pat_len - low))
+              for low in range(0, pat_len, GREEDY_GROUP_LEN)]
+    all_starts = [[] for _ in range(num_seeds)]
+    for nums in all_nums[1:]:
+        DNA_len = len(nums)
+        num_windows = DNA_len - pat_len + 1
+        # each seed gets a block of DNA_len products; the last
+        # pat_len - 1 in each block are not whole windows, & are ignored
+        size = num_seeds * DNA_len
+        all_indexes = {width: _group_indexes(nums, width, num_seeds, pat_len)
+                       for width in {width for _, width in groups}}
+        products = [1] * size
+        for low, width in groups:
+            table = _group_table(counts[low:low + width], num_seeds)
+            indexes = all_indexes[width][low:low + size]
+            products = list(map(mul, products,
+                                map(table.__getitem__, indexes)))
+        for seed, starts in enumerate(all_starts):
+            windows = products[seed * DNA_len:seed * DNA_len + num_windows]
+            start = windows.index(max(windows))
+            starts.append(start)
+            for i, num in enumerate(nums[start:start + pat_len]):
+                counts[i][4 * seed + num] += 1
+    # in each column, every motif not matching the most common base adds 1
+    num_DNAs = len(all_nums)
+    scores = [sum(num_DNAs + 1 - max(col[4 * seed:4 * seed + 4])
+                  for col in counts) for seed in range(num_seeds)]
+    return all_starts, scores
+
 def greedy_finder(DNAs: list, pat_len: int) -> list:
     """Use a greedy algorithm to find good motifs
 
-    Moves from motifs -> median -> motifs, saving if better than last
+    Moves from motifs -> median -> motifs, saving if better than last.
+    Seeds are run in batches (see _greedy_batch)
 
     :param DNAs: DNA strings to search for shared motifs
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
     :returns: each string's version of a motif
@@ -339,135 +791,472 @@ def greedy_finder(DNAs: list, pat_len: int) -> list:
     """
 
     ensure_validity(DNAs, pat_len)
-    num_DNAs = len(DNAs)
+    all_nums = encode_all(DNAs)
     # assume first substrings of each string is best
     best_motifs = [DNA[0:pat_len] for DNA in DNAs]
     best_score = score_motifs(best_motifs)
-    # try starting with each substring of the first DNA
-    for i in range(len(DNAs[0]) - pat_len + 1):
-        cur_motifs = [DNAs[0][i:i + pat_len]]
-        # add on new motifs 1 at a time, by most prob
-        for j in range(1, num_DNAs):
-            cur_motifs.append(best_by_profile(DNAs[j], get_profile(cur_motifs)))
-        cur_score = score_motifs(cur_motifs)
-        # update if necessary
-        if cur_score < best_score:
-            best_motifs, best_score = cur_motifs, cur_score
+    # try starting with each substring of the first DNA; seeds with the
+    # same substring end the same, so only the first of them is run
+    first_nums = all_nums[0]
+    firsts = {}
+    for i in range(len(first_nums) - pat_len + 1):
+        firsts.setdefault(first_nums[i:i + pat_len], i)
+    seeds = list(firsts.values())
+    max_len = max(len(nums) for nums in all_nums[1:])
+    batch_size = max(1, GREEDY_BATCH_WINDOWS // max_len)
+    for low in range(0, len(seeds), batch_size):
+        batch = seeds[low:low + batch_size]
+        all_starts, scores = _greedy_batch(
+            all_nums, [first_nums[i:i + pat_len] for i in batch], pat_len)
+        # update if necessary, in seed order
+        for seed, starts, score in zip(batch, all_starts, scores):
+            if score < best_score:
+                best_score = score
+                best_motifs = [DNAs[0][seed:seed + pat_len]] + [
+                    DNA[start:start + pat_len]
+                    for DNA, start in zip(DNAs[1:], starts)]
     return best_motifs
 
-def one_random_finder(DNAs: list, pat_len: int) -> list:
+def one_random_finder(DNAs: list, pat_len: int, rng=None) -> list:
     """Run a randomized algorithm once to find decent motifs
 
     Moves from motifs -> median -> motifs, saving if better than last
     and leaving if not
 
     :param DNAs: DNA strings to search for shared motifs
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
-    :returns: each string's version of a motif
-    :rtype: list (of strs)
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
+    :returns: each string's version of a motif, & their score
+    :rtype: tuple (list (of strs), int)
     """
     
+    rng = get_rng(rng)
     num_DNAs = len(DNAs)
+    all_nums = encode_all(DNAs)
     best_motifs = []
     for i in range(num_DNAs):
-        start = choice(range(len(DNAs[i]) - pat_len + 1))
+        start = rng.choice(range(len(DNAs[i]) - pat_len + 1))
         best_motifs.append(DNAs[i][start:start + pat_len])
     best_score = score_motifs(best_motifs)
     while True:
         profile = get_profile(best_motifs)
-        cur_motifs = [best_by_profile(DNA, profile) for DNA in DNAs]
+        cur_motifs = []
+        for DNA, nums in zip(DNAs, all_nums):
+            start = best_start(nums, profile)
+            cur_motifs.append(DNA[start:start + pat_len])
         cur_score = score_motifs(cur_motifs, profile)
         if cur_score < best_score:
             best_motifs, best_score = cur_motifs, cur_score
         else:
             return best_motifs, best_score
 
-def random_finder(DNAs: list, pat_len: int) -> list:
+# what each restart worker process needs, sent to it once
+_restart_args = None
+
+def _init_restarts(finder, DNAs: list, pat_len: int, args: tuple):
+    """Stores the search every restart in this worker process runs
+
+    :param finder: the one-restart motif finder to run
+    :type finder: function
+    :param DNAs: DNA strings to search for shared motifs
+    :type DNAs: list (of strs) or DNACollection
+    :param pat_len: the length of motifs to search for
+    :type pat_len: int
+    :param args: any more arguments for finder
+    :type args: tuple
+    """
+
+    global _restart_args
+    _restart_args = (finder, DNAs, pat_len, args)
+
+def _one_restart(seed: int) -> tuple:
+    """Runs one restart of the stored search, in a worker process
+
+    :param seed: the seed for this restart's random numbers
+    :type seed: int
+    :returns: the motifs found, & their score
+    :rtype: tuple (list (of strs), int)
+    """
+
+    finder, DNAs, pat_len, args = _restart_args
+    return finder(DNAs, pat_len, *args, rng=random.Random(seed))
+
+def _best_restart(results, target_score: int) -> tuple:
+    """Picks the best of some restarts' results, in order
+
+    :param results: each restart's motifs & score
+    :type results: iterable (of tuples (list (of strs), int))
+    :param target_score: a score good enough to stop at, or None
+    :type target_score: int
+    :returns: the first motifs with the lowest score, & that score
+    :rtype: tuple (list (of strs), int)
+    """
+
+    best_motifs, best_score = None, None
+    for cur_motifs, cur_score in results:
+        if best_score is None or cur_score < best_score:
+            best_motifs, best_score = cur_motifs, cur_score
+        if target_score is not None and best_score <= target_score:
+            break
+    return best_motifs, best_score
+
+def run_restarts(finder, DNAs: list, pat_len: int, restarts: int,
+                 workers: int = 1, seed=None, target_score: int = None,
+                 args: tuple = ()) -> tuple:
+    """Runs a randomized motif finder many times, keeping the best result
+
+    Each restart gets its own random numbers, seeded from one stream,
+    so results only depend on seed - not on how many workers run them.
+    Worker processes get the DNA strings once, when they start
+
+    :param finder: the one-restart motif finder to run, taking
+                   (DNAs, pat_len, *args, rng=...)
+    :type finder: function
+    :param DNAs: DNA strings to search for shared motifs
+    :type DNAs: list (of strs) or DNACollection
+    :param pat_len: the length of motifs to search for
+    :type pat_len: int
+    :param restarts: the most times to run finder
+    :type restarts: int
+    :param workers: the number of processes to run in (default 1)
+    :type workers: int
+    :param seed: where to draw every restart's seed from (default None,
+                 see get_rng)
+    :type seed: random.Random or int
+    :param target_score: stop as soon as a restart scores this or lower
+                         (default None, to never stop early)
+    :type target_score: int
+    :param args: any more arguments for finder (default none)
+    :type args: tuple
+    :returns: the best motifs found, & their score
+    :rtype: tuple (list (of strs), int)
+    """
+
+    if restarts < 1:
+        raise ValueError('Must run at least 1 restart')
+    if workers < 1:
+        raise ValueError('Must run with at least 1 worker')
+    stream = get_rng(seed)
+    seeds = [stream.getrandbits(64) for _ in range(restarts)]
+    if workers == 1:
+        return _best_restart((finder(DNAs, pat_len, *args,
+                                     rng=random.Random(cur_seed))
+                              for cur_seed in seeds), target_score)
+    with ProcessPoolExecutor(workers, initializer=_init_restarts,
+                             initargs=(finder, DNAs, pat_len, args)) as pool:
+        futures = [pool.submit(_one_restart, cur_seed) for cur_seed in seeds]
+        try:
+            # results are taken in restart order, whenever they finish
+            return _best_restart((future.result() for future in futures),
+                                 target_score)
+        finally:
+            for future in futures:
+                future.cancel()
+
+def random_finder(DNAs: list, pat_len: int, restarts: int = 1000,
+                  workers: int = 1, seed=None,
+                  target_score: int = None) -> list:
     """Use a randomized algorithm to find good motifs
 
-    Runs one_random_finder 10000 times, returning best result
+    Runs one_random_finder many times (see run_restarts), returning
+    best result
 
     :param DNAs: DNA strings to search for shared motifs
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
+    :param restarts: the most times to run one_random_finder (default 1000)
+    :type restarts: int
+    :param workers: the number of processes to run in (default 1)
+    :type workers: int
+    :param seed: where to draw all random numbers from (default None,
+                 see get_rng)
+    :type seed: random.Random or int
+    :param target_score: a score good enough to stop at (default None)
+    :type target_score: int
     :returns: each string's version of a motif
     :rtype: list (of strs)
     """
 
     ensure_validity(DNAs, pat_len)
-    best_motifs, best_score = one_random_finder(DNAs, pat_len)
-    for i in range(999):
-        cur_motifs, cur_score = one_random_finder(DNAs, pat_len)
-        if cur_score < best_score:
-            best_motifs, best_score = cur_motifs, cur_score
-    return best_motifs
+    return run_restarts(one_random_finder, DNAs, pat_len, restarts, workers,
+                        seed, target_score)[0]
 
-def one_sampler_finder(DNAs: list, pat_len: int) -> list:
+def one_sampler_finder(DNAs: list, pat_len: int, log: bool = False,
+                       rng=None) -> list:
     """Run a randomized sampler algorithm once to find decent motifs
 
     Moves from motifs -> median -> motifs, saving if better than last
 
     :param DNAs: DNA strings to search for shared motifs
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
-    :returns: each string's version of a motif
-    :rtype: list (of strs)
+    :param log: whether to weigh windows in log-space, which cannot
+                underflow for long motifs (default False)
+    :type log: bool
+    :param rng: where to draw random numbers from (default None, see
+                get_rng)
+    :type rng: random.Random or int
+    :returns: each string's version of a motif, & their score
+    :rtype: tuple (list (of strs), int)
     """
     
+    rng = get_rng(rng)
     num_DNAs = len(DNAs)
-    best_motifs = []
-    for i in range(num_DNAs):
-        start = choice(range(len(DNAs[i]) - pat_len + 1))
-        best_motifs.append(DNAs[i][start:start + pat_len])
-    best_score = score_motifs(best_motifs)
-    cur_motifs = list(best_motifs)
+    all_nums = encode_all(DNAs)
+    # motifs are tracked by where they start in each string
+    starts = [rng.choice(range(len(DNA) - pat_len + 1)) for DNA in DNAs]
+    counts = MotifCounts([nums[start:start + pat_len]
+                          for nums, start in zip(all_nums, starts)], pat_len)
+    best_starts, best_score = list(starts), counts.score
     for i in range(2500):
         # randomely remove one motif
-        change = choice(range(num_DNAs))
-        del cur_motifs[change]
+        change = rng.choice(range(num_DNAs))
+        nums = all_nums[change]
+        counts.remove(nums[starts[change]:starts[change] + pat_len])
         # build profile sans motif
-        profile = get_profile(cur_motifs)
+        profile = counts.profile(log)
         # choose a new motif for that DNA string with weighted probability
-        weighted_probs = [calc_prob(DNAs[change][i:i + pat_len], profile)
-                          for i in range(len(DNAs[change]) - pat_len + 1)]        
-        start = choices(range(len(weighted_probs)), weights=weighted_probs)[0]
-        # insert back in and re-calcualte
-        cur_motifs.insert(change, DNAs[change][start:start + pat_len])
-        cur_score = score_motifs(cur_motifs, profile)
-        if cur_score < best_score:
-            best_motifs, best_score = cur_motifs, cur_score
+        weighted_probs = profile_scores(nums, profile, log)
+        if log:
+            weighted_probs = log_weights(weighted_probs)
+        start = weighted_choice(weighted_probs, rng)
+        # insert back in, updating the score as it goes
+        starts[change] = start
+        counts.add(nums[start:start + pat_len])
+        if counts.score < best_score:
+            best_starts, best_score = list(starts), counts.score
+    best_motifs = [DNA[start:start + pat_len]
+                   for DNA, start in zip(DNAs, best_starts)]
     return best_motifs, best_score
 
-def sampler_finder(DNAs: list, pat_len: int) -> list:
+def sampler_finder(DNAs: list, pat_len: int, log: bool = False,
+                   restarts: int = 20, workers: int = 1, seed=None,
+                   target_score: int = None) -> list:
     """Use a randomized sampler algorithm to find good motifs
 
-    Runs one_sampler_finder 10000 times, returning best result
+    Runs one_sampler_finder many times (see run_restarts), returning
+    best result
 
     :param DNAs: DNA strings to search for shared motifs
-    :type DNAs: list (of strs)
+    :type DNAs: list (of strs) or DNACollection
     :param pat_len: the length of motifs to search for
     :type pat_len: int
+    :param log: whether to weigh windows in log-space (default False)
+    :type log: bool
+    :param restarts: the most times to run one_sampler_finder (default 20)
+    :type restarts: int
+    :param workers: the number of processes to run in (default 1)
+    :type workers: int
+    :param seed: where to draw all random numbers from (default None,
+                 see get_rng)
+    :type seed: random.Random or int
+    :param target_score: a score good enough to stop at (default None)
+    :type target_score: int
     :returns: each string's version of a motif
     :rtype: list (of strs)
     """
 
     ensure_validity(DNAs, pat_len)
-    best_motifs, best_score = one_sampler_finder(DNAs, pat_len)
-    for i in range(19):
-        cur_motifs, cur_score = one_sampler_finder(DNAs, pat_len)
-        if cur_score < best_score:
-            best_motifs, best_score = cur_motifs, cur_score
+    return run_restarts(one_sampler_finder, DNAs, pat_len, restarts, workers,
+                        seed, target_score, (log,))[0]
+
+def _em_expect(all_nums: list, log_profile: list) -> (list, float):
+    """The E-step: how likely each window is to be its string's motif
+
+    Assumes exactly one motif per string, equally likely to start
+    anywhere, against a uniform background
+
+    :param all_nums: each DNA string, encoded (see encode)
+    :type all_nums: list (of bytes)
+    :param log_profile: a log-probability profile, 4 rows
+    :type log_profile: list (of lists (of floats))
+    :returns: for each string, a list where [i] is the chance its motif
+              starts at i, & the log-likelihood of the profile
+    :rtype: tuple (list (of lists (of floats)), float)
+    """
+
+    all_weights = []
+    likelihood = 0.
+    for nums in all_nums:
+        log_probs = profile_scores(nums, log_profile, True)
+        total = log_sum_exp(log_probs)
+        likelihood += total
+        all_weights.append([exp(log_prob - total) for log_prob in log_probs])
+    return all_weights, likelihood
+
+def _em_maximize(all_matches: list, all_weights: list, pat_len: int) -> list:
+    """The M-step: a profile from every window, weighted by its chance
+
+    Expected counts get the same pseudocounts as get_profile
+
+    :param all_matches: for each DNA string, byte strings for A, C & G
+                        with 1 wherever it matches that base
+    :type all_matches: list (of lists (of bytes))
+    :param all_weights: for each string, the chance its motif starts at
+                        each window (see _em_expect)
+    :type all_weights: list (of lists (of floats))
+    :param pat_len: the length of motifs to search for
+    :type pat_len: int
+    :returns: the new log-probability profile
+    :rtype: list (of lists (of floats))
+    """
+
+    counts = [[1.] * pat_len for _ in range(4)]
+    for matches, weights in zip(all_matches, all_weights):
+        num_windows = len(weights)
+        # each string's weights add up to 1, so T gets what is left
+        for row, match in zip(counts, matches[:3]):
+            for i in range(pat_len):
+                # the weights of all windows with this base at column i
+                row[i] += sum(compress(weights, match[i:i + num_windows]))
+    num_motifs = len(all_weights)
+    counts[3] = [num_motifs + 4 - sum(col) for col in zip(*counts[:3])]
+    log_total = ln(num_motifs + 4)
+    return [[ln(count) - log_total for count in row] for row in counts]
+
+def _em_rounds(all_nums: list, all_matches: list, log_profile: list,
+               weights: list, likelihood: float, rounds: int,
+               tolerance: float) -> tuple:
+    """Runs rounds of EM until the log-likelihood stops improving
+
+    :param all_nums: each DNA string, encoded (see encode)
+    :type all_nums: list (of bytes)
+    :param all_matches: for each DNA string, byte strings for A, C & G
+                        with 1 wherever it matches that base
+    :type all_matches: list (of lists (of bytes))
+    :param log_profile: the profile from the last M-step
+    :type log_profile: list (of lists (of floats))
+    :param weights: the chances from the last E-step (see _em_expect)
+    :type weights: list (of lists (of floats))
+    :param likelihood: the log-likelihood from the last E-step
+    :type likelihood: float
+    :param rounds: the most rounds to run
+    :type rounds: int
+    :param tolerance: stop once a round improves the log-likelihood by
+                      less than this
+    :type tolerance: float
+    :returns: the last log-probability profile, with its chances &
+              log-likelihood
+    :rtype: tuple (list (of lists (of floats)), list (of lists (of
+            floats)), float)
+    """
+
+    pat_len = len(all_nums[0]) - len(weights[0]) + 1
+    for _ in range(rounds):
+        log_profile = _em_maximize(all_matches, weights, pat_len)
+        last_likelihood = likelihood
+        weights, likelihood = _em_expect(all_nums, log_profile)
+        if likelihood - last_likelihood < tolerance:
+            break
+    return log_profile, weights, likelihood
+
+def _em_first_rounds(all_nums: list, all_matches: list, pat_len: int):
+    """Runs one round of EM from every distinct window of the first string
+
+    Like MEME, starts are rated after a round rather than as they are.
+    A starting profile gives EM_START_PROB to the bases of one window,
+    so its E-step only depends on each window's distance to that one;
+    distances are found on packed numbers instead of scoring every column
+
+    :param all_nums: each DNA string, encoded (see encode)
+    :type all_nums: list (of bytes)
+    :param all_matches: for each DNA string, byte strings for A, C & G
+                        with 1 wherever it matches that base
+    :type all_matches: list (of lists (of bytes))
+    :param pat_len: the length of motifs to search for
+    :type pat_len: int
+    :returns: for each distinct window, in order, the profile after one
+              round, with its chances & log-likelihood
+    :rtype: generator (of tuples (list (of lists (of floats)), list (of
+            lists (of floats)), float))
+    """
+
+    # the chance of a window falls by this factor with each mismatch
+    gap = ln(EM_START_PROB) - ln((1 - EM_START_PROB) / 3)
+    factors = [exp(-dist * gap) for dist in range(pat_len + 1)]
+    all_codes = [encoded_kmer_codes(nums, pat_len) for nums in all_nums]
+    for code in dict.fromkeys(all_codes[0]):
+        all_weights = []
+        for codes in all_codes:
+            chances = list(map(factors.__getitem__,
+                               code_dists(codes, code, pat_len)))
+            total = sum(chances)
+            all_weights.append([chance / total for chance in chances])
+        log_profile = _em_maximize(all_matches, all_weights, pat_len)
+        yield (log_profile,) + _em_expect(all_nums, log_profile)
+
+def em_finder(DNAs: list, pat_len: int, starts: int = 20,
+              iterations: int = 50, tolerance: float = 1e-3) -> list:
+    """Use expectation-maximization to find good motifs
+
+    Like MEME's one-occurrence-per-sequence model: a starting profile
+    from every distinct window of the first string gets one round of EM
+    - weighing every window of every string at once - & the likeliest
+    few get a few more. The likeliest after that is refined until its
+    log-likelihood stops improving
+
+    :param DNAs: DNA strings to search for shared motifs
+    :type DNAs: list (of strs) or DNACollection
+    :param pat_len: the length of motifs to search for
+    :type pat_len: int
+    :param starts: the number of starting profiles to try further
+                   (default 20)
+    :type starts: int
+    :param iterations: the most rounds of EM in all (default 50)
+    :type iterations: int
+    :param tolerance: stop once a round improves the log-likelihood by
+                      less than this (default 1e-3)
+    :type tolerance: float
+    :returns: each string's version of a motif
+    :rtype: list (of strs)
+    """
+
+    ensure_validity(DNAs, pat_len)
+    if starts < 1:
+        raise ValueError('Must refine at least 1 starting profile')
+    if iterations < 1:
+        raise ValueError('Must run at least 1 round of EM')
+    all_nums = encode_all(DNAs)
+    if any(len(nums) < pat_len for nums in all_nums):
+        raise ValueError('DNA strings must be at least as long as motifs')
+    all_matches = [[nums.translate(table) for table in _MATCH_TABLES[:3]]
+                   for nums in all_nums]
+    firsts = nlargest(starts, _em_first_rounds(all_nums, all_matches,
+                                               pat_len), key=itemgetter(2))
+    best = None
+    # the likeliest starts get a few trial rounds, then only the best goes on
+    for first in firsts:
+        refined = _em_rounds(all_nums, all_matches, *first,
+                             min(EM_TRIAL_ROUNDS, iterations - 1), tolerance)
+        if best is None or refined[2] > best[2]:
+            best = refined
+    rounds = iterations - 1 - EM_TRIAL_ROUNDS
+    if rounds > 0:
+        best = _em_rounds(all_nums, all_matches, *best, rounds, tolerance)
+    best_profile = best[0]
+    best_motifs = []
+    for DNA, nums in zip(DNAs, all_nums):
+        start = best_start(nums, best_profile, True)
+        best_motifs.append(DNA[start:start + pat_len])
     return best_motifs
 
 if __name__ == '__main__':
-    with open('data.txt') as data:
-        pat_len, _, __ = [int(x) for x in data.readline().split()]
-        DNAs = []
-        for line in data:
-            DNAs.append(line.rstrip())
+    if len(sys.argv) == 3:
+        # a FASTA/FASTQ file of (short) DNA strings & the motif length
+        pat_len = int(sys.argv[2])
+        DNAs = DNACollection(record.seq
+                             for record in read_records(sys.argv[1]))
+    else:
+        with open('data.txt') as data:
+            pat_len, _, __ = [int(x) for x in data.readline().split()]
+            DNAs = []
+            for line in data:
+                DNAs.append(line.rstrip())
     for motif in sampler_finder(DNAs, pat_len):
         print(motif)
@@ -1,4 +1,12 @@
+import benchmark
+from itertools import islice
+import json
+import math
 import motifs
+import os
+import random
+import seq_utils
+import tempfile
 import unittest
 
 class Tester(unittest.TestCase):
@@ -116,6 +124,30 @@ class Tester(unittest.TestCase):
             self.assertEqual(correct, result, msg=('Test #' + str(test_num)))
             test_num += 1
 
+    def test_brute_exhaustive(self):
+        """Brute-force motif finder should find every motif there is"""
+
+        # motifs near windows already found were once skipped
+        DNAs = ['CCGGGTGTGCA', 'GAATTTATTTT', 'AAACACTCTAT']
+        for pat_len, dist in ((3, 2), (4, 1), (4, 2)):
+            correct = {pat for pat in motifs.all_DNA_strings(pat_len)
+                       if all(any(motifs.ham_dist(pat, DNA[i:i + pat_len])
+                                  <= dist
+                                  for i in range(len(DNA) - pat_len + 1))
+                              for DNA in DNAs)}
+            self.assertEqual(correct,
+                             motifs.brute_finder(DNAs, pat_len, dist))
+        self.assertEqual(59, len(motifs.brute_finder(DNAs, 3, 2)))
+
+    def test_neighborhood(self):
+        """Neighborhoods should hold every neighbor of every window"""
+
+        pats = (motifs.get_neighbors('ACG', 1) + motifs.get_neighbors('CGA', 1)
+                + motifs.get_neighbors('GAC', 1))
+        self.assertEqual({seq_utils.pat_to_code(pat) for pat in pats},
+                         motifs.neighborhood(motifs.encode('ACGACG'), 3, 1))
+        self.assertEqual(set(), motifs.neighborhood(motifs.encode('AC'), 3, 1))
+
     def test_brute_failure(self):
         """Brute-force motif finder should error on bad input"""
 
@@ -123,6 +155,21 @@ class Tester(unittest.TestCase):
             self.assertRaises(ValueError, motifs.brute_finder,
                               DNAs, pat_len, dist)
 
+    def test_all_DNA_strings(self):
+        """All DNA strings should be made lazily, in alphabetical order"""
+
+        self.assertEqual([''], list(motifs.all_DNA_strings(0)))
+        for pat_len in range(1, 5):
+            pats = list(motifs.all_DNA_strings(pat_len))
+            self.assertEqual(4 ** pat_len, len(pats))
+            self.assertEqual(sorted(pats), pats)
+            self.assertEqual([motifs.code_to_pat(code, pat_len) for code
+                              in motifs.all_DNA_codes(pat_len)], pats)
+        self.assertEqual('AAAAAAAAAAAAAAAAAAAAAAAAAAAAAC',
+                         list(islice(motifs.all_DNA_strings(30), 2))[1])
+        self.assertRaises(ValueError, motifs.all_DNA_strings, -1)
+        self.assertRaises(ValueError, motifs.all_DNA_codes, -1)
+
     def test_median(self):
         """Median string finder should find a valid best string"""
 
@@ -130,12 +177,103 @@ class Tester(unittest.TestCase):
             result = motifs.median_string(DNAs, pat_len)
             self.assertIn(result, corrects)
 
+    def test_median_pruned(self):
+        """Pruned median search should match trying every string"""
+
+        rng = random.Random(5)
+        for pat_len in range(1, 6):
+            DNAs = [''.join(rng.choice('ACGT') for _ in range(12))
+                    for __ in range(4)] + ['ACG']
+            pats = list(motifs.all_DNA_strings(pat_len))
+            dists = [sum(min(motifs.ham_dist(pat, DNA[i:i + pat_len])
+                             for i in range(len(DNA) - pat_len + 1))
+                         if len(DNA) >= pat_len else pat_len + 1
+                         for DNA in DNAs)
+                     for pat in pats]
+            best = pats[dists.index(min(dists))]
+            self.assertEqual(best, motifs.median_string(DNAs, pat_len))
+
     def test_median_failure(self):
         """Median string finder should error on bad input"""
 
         for DNAs, pat_len in self.known_median_failure:
             self.assertRaises(ValueError, motifs.median_string, DNAs, pat_len)
 
+    def test_profile_scores(self):
+        """Batched window probabilities should equal one-at-a-time ones"""
+
+        DNA = 'ACCTGTTTATTGCCTAAGTTCCGAACAAACCCAATATAGCCCGAGGGCCT'
+        profile = [[0.2, 0.2, 0.3, 0.2, 0.3], [0.4, 0.3, 0.1, 0.5, 0.1],
+                   [0.3, 0.3, 0.5, 0.2, 0.4], [0.1, 0.2, 0.1, 0.1, 0.2]]
+        probs = motifs.profile_scores(motifs.encode(DNA), profile)
+        self.assertEqual([motifs.calc_prob(DNA[i:i + 5], profile)
+                          for i in range(len(DNA) - 4)], probs)
+        self.assertEqual('CCGAG', motifs.best_by_profile(DNA, profile))
+        self.assertRaises(ValueError, motifs.best_by_profile, 'ACG', profile)
+        self.assertRaises(ValueError, motifs.best_by_profile, DNA,
+                          profile[:3])
+
+    def test_log_profile(self):
+        """Log-space profiles should agree with plain ones, without underflow"""
+
+        found = ['ACGTACGTAA', 'ACGTTCGTAC', 'ACCTACGTAA']
+        profile = motifs.get_profile(found)
+        log_profile = motifs.get_profile(found, True)
+        for row, log_row in zip(profile, log_profile):
+            for prob, log_prob in zip(row, log_row):
+                self.assertAlmostEqual(math.log(prob), log_prob)
+        DNA = 'TTACGTACGTACCTTGA'
+        probs = motifs.profile_scores(motifs.encode(DNA), profile)
+        log_probs = motifs.profile_scores(motifs.encode(DNA), log_profile,
+                                          True)
+        for prob, log_prob in zip(probs, log_probs):
+            self.assertAlmostEqual(math.log(prob), log_prob)
+        self.assertAlmostEqual(log_probs[2], motifs.calc_prob(DNA[2:12],
+                                                              log_profile,
+                                                              True))
+        self.assertEqual(motifs.best_by_profile(DNA, profile),
+                         motifs.best_by_profile(DNA, log_profile, True))
+        weights = motifs.log_weights(log_probs)
+        self.assertAlmostEqual(1, sum(weights))
+        for weight, prob in zip(weights, probs):
+            self.assertAlmostEqual(prob / sum(probs), weight)
+        # far too small for plain floats, but fine once shifted
+        weights = motifs.log_weights([-5000., -5000. + math.log(3)])
+        self.assertAlmostEqual(0.25, weights[0])
+        self.assertAlmostEqual(0.75, weights[1])
+
+    def test_weighted_choice(self):
+        """Weighted choices should match the random module's"""
+
+        weights = [0.1, 0., 2.5, 0.4, 1e-9, 3.]
+        for seed in range(20):
+            rng = random.Random(seed)
+            self.assertEqual(random.Random(seed).choices(range(6), weights)[0],
+                             motifs.weighted_choice(weights, rng))
+        self.assertRaises(ValueError, motifs.weighted_choice, [0., 0.])
+
+    def test_motif_counts(self):
+        """Counts should keep their score & profile up to date"""
+
+        found = ['ACGTA', 'ACCTA', 'TCGTC', 'GGGTA', 'ACGAA']
+        counts = motifs.MotifCounts([motifs.encode(motif)
+                                     for motif in found[:-1]], 5)
+        self.assertEqual(motifs.score_motifs(found[:-1]), counts.score)
+        counts.add(motifs.encode(found[-1]))
+        self.assertEqual(5, counts.num_motifs)
+        self.assertEqual(motifs.score_motifs(found), counts.score)
+        self.assertEqual(motifs.get_profile(found), counts.profile())
+        self.assertEqual(motifs.get_profile(found, True), counts.profile(True))
+        for i in range(len(found)):
+            counts.remove(motifs.encode(found[i]))
+            rest = found[:i] + found[i + 1:]
+            self.assertEqual(motifs.score_motifs(rest), counts.score)
+            self.assertEqual(motifs.get_profile(rest), counts.profile())
+            counts.add(motifs.encode(found[i]))
+        self.assertRaises(ValueError, counts.add, motifs.encode('ACG'))
+        self.assertRaises(ValueError, counts.remove, motifs.encode('TTTTT'))
+        self.assertRaises(ValueError, motifs.MotifCounts, [], 0)
+
     def test_greedy(self):
         """Greedy motif finder should find expected motifs"""
 
@@ -145,6 +283,39 @@ class Tester(unittest.TestCase):
             self.assertEqual(correct, result, msg=('Test #' + str(test_num)))
             test_num += 1
 
+    def test_greedy_batches(self):
+        """Greedy seeds run in batches should match running each alone"""
+
+        rng = random.Random(5)
+        batch_windows = motifs.GREEDY_BATCH_WINDOWS
+        # small batches, so seeds are split up
+        motifs.GREEDY_BATCH_WINDOWS = 50
+        try:
+            for alphabet, pat_len in (('ACGT', 4), ('ACGT', 7), ('AC', 5)):
+                DNAs = [''.join(rng.choices(alphabet, k=30)) for _ in range(6)]
+                best_motifs = [DNA[:pat_len] for DNA in DNAs]
+                for i in range(len(DNAs[0]) - pat_len + 1):
+                    cur_motifs = [DNAs[0][i:i + pat_len]]
+                    for DNA in DNAs[1:]:
+                        cur_motifs.append(motifs.best_by_profile(
+                            DNA, motifs.get_profile(cur_motifs)))
+                    if (motifs.score_motifs(cur_motifs)
+                            < motifs.score_motifs(best_motifs)):
+                        best_motifs = cur_motifs
+                self.assertEqual(best_motifs,
+                                 motifs.greedy_finder(DNAs, pat_len))
+        finally:
+            motifs.GREEDY_BATCH_WINDOWS = batch_windows
+
+    def test_greedy_ties(self):
+        """Greedy motif finder should break exact ties by first window"""
+
+        # GGGT & GCGC are equally likely, though rounded probabilities
+        # put GCGC very slightly ahead
+        DNAs = ['TCGATAACAGCACCCGTT', 'GTTTTT', 'AGCCG',
+                'AAAAGGGGGTGCGCAGGAGG', 'GCGCGT']
+        self.assertEqual(motifs.greedy_finder(DNAs, 4)[3], 'GGGT')
+
     def test_greedy_failure(self):
         """Greedy motif finder should error on bad input"""
         
@@ -175,11 +346,148 @@ class Tester(unittest.TestCase):
             self.assertEqual(correct, result, msg=('Test #' + str(test_num)))
             test_num += 1
 
+    def test_restarts(self):
+        """Seeded restarts should not depend on how many workers run them"""
+
+        DNAs, pat_len, _ = self.known_random[0]
+        for finder, args in ((motifs.one_random_finder, ()),
+                             (motifs.one_sampler_finder, (True,))):
+            result = motifs.run_restarts(finder, DNAs, pat_len, 6, seed=7,
+                                         args=args)
+            self.assertEqual(result, motifs.run_restarts(
+                finder, DNAs, pat_len, 6, seed=7, args=args))
+            self.assertEqual(result, motifs.run_restarts(
+                finder, DNAs, pat_len, 6, 2, 7, args=args))
+            # every restart scores below this, so only the first runs
+            first = motifs.run_restarts(finder, DNAs, pat_len, 1, seed=7,
+                                        args=args)
+            self.assertEqual(first, motifs.run_restarts(
+                finder, DNAs, pat_len, 6, 2, 7, pat_len * len(DNAs),
+                args))
+        self.assertEqual(motifs.random_finder(DNAs, pat_len, 30, seed=1),
+                         motifs.random_finder(DNAs, pat_len, 30, 3, 1))
+        # generators can be passed wherever seeds can
+        self.assertEqual(motifs.random_finder(DNAs, pat_len, 30, seed=1),
+                         motifs.random_finder(DNAs, pat_len, 30,
+                                              seed=random.Random(1)))
+        self.assertEqual(motifs.sampler_finder(DNAs, pat_len, restarts=2,
+                                               seed=4),
+                         motifs.sampler_finder(DNAs, pat_len, restarts=2,
+                                               seed=random.Random(4)))
+        self.assertEqual(motifs.one_random_finder(DNAs, pat_len, 5),
+                         motifs.one_random_finder(DNAs, pat_len,
+                                                  random.Random(5)))
+        self.assertRaises(ValueError, motifs.run_restarts,
+                          motifs.one_random_finder, DNAs, pat_len, 0)
+        self.assertRaises(ValueError, motifs.sampler_finder, DNAs, pat_len,
+                          workers=0)
+
     def test_sampler_failure(self):
         """Random-sampler motif finder should error on bad input"""
         
         for DNAs, pat_len in self.known_g_or_r_failure:
             self.assertRaises(ValueError, motifs.sampler_finder, DNAs, pat_len)
             
+    def test_em(self):
+        """EM motif finder should find planted motifs"""
+
+        rng = random.Random(2)
+        DNAs, motif = benchmark.plant_motifs(10, 60, 8, 1, rng)
+        result = motifs.em_finder(DNAs, 8)
+        self.assertEqual(len(DNAs), len(result))
+        for DNA, found in zip(DNAs, result):
+            self.assertIn(found, DNA)
+            self.assertLessEqual(motifs.ham_dist(motif, found), 2)
+        self.assertEqual(motif, motifs.consensus_string(
+            motifs.get_profile(result)))
+        self.assertEqual(result, motifs.em_finder(
+            motifs.DNACollection(DNAs), 8))
+
+    def test_em_data(self):
+        """EM motif finder should do no worse than greedy on the data"""
+
+        DNAs, pat_len = benchmark.read_data(benchmark.DATA_PATH)
+        self.assertLessEqual(
+            motifs.score_motifs(motifs.em_finder(DNAs, pat_len)),
+            motifs.score_motifs(motifs.greedy_finder(DNAs, pat_len)))
+
+    def test_em_failure(self):
+        """EM motif finder should error on bad input"""
+
+        for DNAs, pat_len in self.known_g_or_r_failure:
+            self.assertRaises(ValueError, motifs.em_finder, DNAs, pat_len)
+        DNAs = ['ACGTACGT', 'TTACGTAA']
+        self.assertRaises(ValueError, motifs.em_finder, DNAs, 9)
+        self.assertRaises(ValueError, motifs.em_finder, DNAs, 3, starts=0)
+        self.assertRaises(ValueError, motifs.em_finder, DNAs, 3,
+                          iterations=0)
+
+    def test_collection(self):
+        """Finders should give the same motifs for collections & lists"""
+
+        DNAs, pat_len, correct = self.known_greedy[0]
+        collection = motifs.DNACollection(DNA.encode() for DNA in DNAs)
+        self.assertEqual(len(DNAs), len(collection))
+        self.assertEqual(DNAs, list(collection))
+        self.assertEqual(DNAs[1:], collection[1:])
+        self.assertEqual(motifs.encode(DNAs[2]), collection.nums[2])
+        self.assertEqual(correct, motifs.greedy_finder(collection, pat_len))
+        self.assertEqual(motifs.median_string(DNAs, pat_len),
+                         motifs.median_string(collection, pat_len))
+        self.assertEqual(motifs.brute_finder(DNAs, pat_len, 1),
+                         motifs.brute_finder(collection, pat_len, 1))
+        self.assertEqual(motifs.random_finder(DNAs, pat_len, 5, seed=3),
+                         motifs.random_finder(collection, pat_len, 5, seed=3))
+        self.assertEqual(motifs.sampler_finder(DNAs, pat_len, restarts=2,
+                                               seed=3),
+                         motifs.sampler_finder(collection, pat_len,
+                                               restarts=2, seed=3))
+        self.assertRaises(ValueError, motifs.DNACollection, ['ACGT', 'ACGN'])
+        self.assertRaises(ValueError, motifs.DNACollection, ['ACGT', ''])
+        self.assertRaises(ValueError, motifs.greedy_finder,
+                          motifs.DNACollection(['ACGT']), 2)
+
+    def test_benchmark(self):
+        """Benchmarks should plant motifs & record every finder"""
+
+        rng = random.Random(1)
+        DNAs, motif = benchmark.plant_motifs(5, 30, 6, 1, rng)
+        self.assertEqual(5, len(DNAs))
+        self.assertTrue(all(len(DNA) == 30 for DNA in DNAs))
+        self.assertLessEqual(benchmark.median_dist(DNAs, motif), 5)
+        self.assertRaises(ValueError, benchmark.plant_motifs, 5, 5, 6, 1, rng)
+        self.assertRaises(ValueError, benchmark.plant_motifs, 5, 30, 6, 7,
+                          rng)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'benchmark.json')
+            records = benchmark.run_benchmarks([('tiny', DNAs, 6, 1)], path)
+            with open(path) as data:
+                self.assertEqual(records, json.load(data))
+        self.assertEqual(['greedy_finder', 'random_finder', 'sampler_finder',
+                          'em_finder', 'median_string', 'brute_finder'],
+                         [record['finder'] for record in records])
+        for record in records:
+            self.assertIsNone(record['peak_bytes'])
+            self.assertGreaterEqual(record['seconds'], 0)
+        self.assertIn(motif, motifs.brute_finder(DNAs, 6, 1))
+        # memory is only traced when asked for
+        seconds, peak, result = benchmark.measure(
+            lambda: motifs.greedy_finder(DNAs, 6), trace_memory=True)
+        self.assertGreater(peak, 0)
+        self.assertEqual(motifs.greedy_finder(DNAs, 6), result)
+        # exhaustive finders are gated on their own costs
+        DNAs, pat_len = benchmark.read_data(benchmark.DATA_PATH)
+        names = [name for name, _, __ in
+                 benchmark.finder_runs(DNAs, pat_len, 0)]
+        self.assertIn('brute_finder', names)
+        self.assertNotIn('median_string', names)
+        names = [name for name, _, __ in
+                 benchmark.finder_runs(DNAs, pat_len, 4)]
+        self.assertNotIn('brute_finder', names)
+        names = [name for name, _, __ in
+                 benchmark.finder_runs(DNAs, pat_len, None)]
+        self.assertNotIn('brute_finder', names)
+        self.assertIsNone(benchmark.datasets(())[0][3])
+
 if __name__ == '__main__':
     unittest.main()
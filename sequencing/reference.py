@@ -1,7 +1,5 @@
 BASES = ('A', 'C', 'G', 'T')
 
-COMP = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A'}
-
 RNA_to_amino = {'AAA': 'K', 'AAC': 'N', 'AAG': 'K', 'AAU': 'N', 'ACA': 'T',
                 'ACC': 'T', 'ACG': 'T', 'ACU': 'T', 'AGA': 'R', 'AGC': 'S',
                 'AGG': 'R', 'AGU': 'S', 'AUA': 'I', 'AUC': 'I', 'AUG': 'M',
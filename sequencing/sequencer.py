@@ -1,4 +1,12 @@
+import os
+import sys
+
 from reference import *
+# shared sequence utilities live in the top-level common directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'common'))
+from fasta import read_records
+from seq_utils import iter_rev_comp, rev_comp
 
 def translate_RNA(RNA: str) -> str:
     """Translates an RNA string into a protein
@@ -18,7 +26,7 @@ def translate_DNA(DNA: str, DNA_len: int=-1) -> str:
     """Translates an DNA string into a protein
 
     :param DNA: the DNA string to translate
-    :type DNA: str
+    :type DNA: str or bytes-like
     :param DNA_len: the length of the DNA string
     :type DNA_len: int
     :returns: the transcribed protein string
@@ -27,41 +35,30 @@ def translate_DNA(DNA: str, DNA_len: int=-1) -> str:
 
     if DNA_len < 0:
         DNA_len = len(DNA)
+    # records read from files hold their DNA as bytes
+    if not isinstance(DNA, str):
+        DNA = bytes(DNA[:DNA_len]).decode('ascii')
     protein = ''
     for i in range(0, DNA_len, 3):
         protein += DNA_to_amino[DNA[i:i + 3]]
     return protein
 
-def rev_comp(pat: str) -> str:
-    """Finds the reverse complement of a DNA string
-
-    :param pat: the DNA string to REVerse COMPlement
-    :type pat: str
-    :returns: the reverse complement of pat
-    :rtype: str
-    """
-
-    if not pat:
-        raise ValueError('Cannot reverse-complement empty string')
-    rev = ''
-    for base in pat:
-        try:
-            rev = COMP.get(base) + rev
-        except TypeError:
-            raise ValueError('Non-DNA base "' + base + '" in given string')
-    return rev
-
-def find_hidden_proteins(DNA: str, protein: str, allow_rev_comp: bool) -> list:
+def find_hidden_proteins(DNA: str, protein: str, allow_rev_comp: bool,
+                         chunk_size: int=1 << 20) -> list:
     """Finds substrings of DNA that encode a protien
 
     :param DNA: the DNA string to look through
-    :type DNA: str
+    :type DNA: str or bytes-like
     :param protein: the protein string to look for
     :type protein: str
     :param allow_rev_comp: whether reverse complementary strings should
                            be considered
     :type allow_rev_comp: bool
-    :returns: all substrings in DNA that encode protein
+    :param chunk_size: the number of bases of the reverse complement
+                       made at a time (default 2^20)
+    :type chunk_size: int
+    :returns: all substrings in DNA that encode protein, as the same
+              type as DNA
     :rtype: list
     """
 
@@ -86,17 +83,31 @@ def find_hidden_proteins(DNA: str, protein: str, allow_rev_comp: bool) -> list:
             start += 3
             
     if allow_rev_comp:
-        rev_matches = find_hidden_proteins(rev_comp(DNA), protein, False)
-        for rev in rev_matches:
-            subs.append(rev_comp(rev))
+        # the reverse complement is made a piece at a time, each piece
+        # carrying over just too little of the last to hold a match, so
+        # matches across pieces are found once
+        carry = None
+        for chunk in iter_rev_comp(DNA, chunk_size):
+            piece = chunk if carry is None else carry + chunk
+            for rev in find_hidden_proteins(piece, protein, False):
+                subs.append(rev_comp(rev))
+            carry = piece[max(len(piece) - sub_len + 1, 0):]
             
     return subs
 
 if __name__ == '__main__':
-    with open('data.txt') as data:
-        DNA = data.readline().rstrip()
-        protein = data.readline().rstrip()
-    subs = find_hidden_proteins(DNA, protein, True)
+    if len(sys.argv) == 3:
+        # a FASTA/FASTQ file, streamed one record at a time, & the protein
+        protein = sys.argv[2]
+        subs = []
+        for record in read_records(sys.argv[1]):
+            subs += [sub.decode('ascii') for sub in
+                     find_hidden_proteins(record.seq, protein, True)]
+    else:
+        with open('data.txt') as data:
+            DNA = data.readline().rstrip()
+            protein = data.readline().rstrip()
+        subs = find_hidden_proteins(DNA, protein, True)
     with open('output.txt', mode='w') as output:
         for sub in subs:
             output.write(sub)
@@ -43,6 +43,11 @@ class Tester(unittest.TestCase):
         for DNA, protein, subs in self.known_hidden_proteins:
             result = sequencer.find_hidden_proteins(DNA, protein, True)
             self.assertCountEqual(result, subs)
+            # a few bases of the reverse complement at a time
+            for chunk_size in (1, 4, 7):
+                result = sequencer.find_hidden_proteins(DNA, protein, True,
+                                                        chunk_size)
+                self.assertCountEqual(result, subs)
 
     def test_ideal_spectrum(self):
         """Ideal spectrum calculator should work correctly"""